@@ -1,39 +1,360 @@
 from dataclasses import dataclass
+import collections
+import concurrent.futures
+import math
+import os
+import queue
 import tempfile
-import ffmpeg
+import threading
+from typing import Optional
 
+import skia
+
+import momapy.builder
 import momapy.core
-import momapy.rendering
+import momapy.rendering.core
+import momapy.rendering.skia
+import momapy.utils
+
+ffmpeg = momapy.utils.lazy_import("ffmpeg")
+
 
+# renders the (x, y, width, height) pixel rects of a frame of the given size,
+# or the whole frame if rects is None, in one pass over the layout: their
+# bounding rect is rendered, clipped to the rects; rects have integer
+# coordinates, so that they are rendered with the pixel grid of the frame
+def _render_frame_patches(layout, size, rects=None):
+    if rects is None:
+        rects = [(0, 0, size[0], size[1])]
+    x0 = min([x for x, y, width, height in rects])
+    y0 = min([y for x, y, width, height in rects])
+    x1 = max([x + width for x, y, width, height in rects])
+    y1 = max([y + height for x, y, width, height in rects])
+    renderer = momapy.rendering.skia.SkiaRenderer.from_file(
+        None, x1 - x0, y1 - y0, "array"
+    )
+    renderer.begin_session()
+    if len(rects) > 1:
+        region = skia.Region()
+        for x, y, width, height in rects:
+            region.op(
+                skia.IRect.MakeXYWH(x - x0, y - y0, width, height),
+                skia.Region.kUnion_Op,
+            )
+        renderer.canvas.clipRegion(region)
+    renderer.canvas.translate(-x0, -y0)
+    renderer.render_layout_element(layout)
+    renderer.end_session()
+    array = renderer.config["array"]
+    return [
+        (x, y, array[y - y0 : y - y0 + height, x - x0 : x - x0 + width])
+        for x, y, width, height in rects
+    ]
 
+
+# the layout is snapshotted and rendered with skia each time frames are added;
+# a frame is only rendered again if the layout changed since the previous
+# frames. When the output file is given, frames are RGBA buffers that a writer
+# thread pipes to the stdin of ffmpeg, with at most max_queued_frames buffers
+# waiting to be written; otherwise, frames are written to temporary png files
+# that ffmpeg concatenates when the animation is built. With more than one
+# worker, frames are rendered in a pool of processes and reassembled in order;
+# when incremental, only the rects drawn by the elements of the layout that
+# changed since the previous frame are rendered again. Building the animation
+# releases the workers, ffmpeg and the temporary files; an animator that is not
+# built must be closed, e.g. by using it as a context manager
 @dataclass
 class Animator(object):
     layout: momapy.core.MapLayout
     fps: int = 60
+    output_file: Optional[str] = None
+    vcodec: str = "libx264"
+    max_queued_frames: int = 4
+    max_workers: Optional[int] = 1
+    incremental: bool = False
+    dirty_margin: float = 2.0
 
     def __post_init__(self):
         self._initialize()
 
     def _initialize(self):
-        flimages = tempfile.mkstemp()
-        self._flimages = (open(flimages[1], "w"), flimages[1])
+        self._previous_layout = None
+        self._bounds_renderer = None
+        self._size = None
+        self._frame = None
+        self._frame_file_path = None
         self._n_images = 0
+        self._pending = collections.deque()
+        if self.max_workers is None:
+            self._n_workers = os.cpu_count()
+        else:
+            self._n_workers = self.max_workers
+        self._pool = None
+        if self.output_file is None:
+            fd, file_path = tempfile.mkstemp(suffix=".txt")
+            os.close(fd)
+            self._flimages = (open(file_path, "w"), file_path)
+            self._image_file_paths = []
+        else:
+            self._process = None
+            self._writer = None
+            self._writer_error = None
+            self._queue = queue.Queue(maxsize=self.max_queued_frames)
+
+    # the pool of processes is only started when the first frame is rendered
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._n_workers
+            )
+        return self._pool
+
+    def _get_layout_snapshot(self):
+        if isinstance(self.layout, momapy.builder.Builder):
+            return momapy.builder.object_from_builder(self.layout)
+        return self.layout
+
+    # the dirty rect of an element is the bounds of its recorded skia picture,
+    # that include its strokes and filters, grown by dirty_margin
+    def _get_dirty_rect(self, layout_element, state, transform):
+        if self._bounds_renderer is None:
+            self._bounds_renderer = (
+                momapy.rendering.skia.SkiaRenderer.from_file(
+                    None, 1, 1, "array"
+                )
+            )
+            self._bounds_renderer.begin_session()
+        bbox = momapy.rendering.core.transform_bbox(
+            self._bounds_renderer.get_layout_element_bounds(
+                layout_element, state
+            ),
+            transform,
+        )
+        north_west = bbox.north_west()
+        south_east = bbox.south_east()
+        x0 = max(math.floor(north_west.x - self.dirty_margin), 0)
+        y0 = max(math.floor(north_west.y - self.dirty_margin), 0)
+        x1 = min(math.ceil(south_east.x + self.dirty_margin), self._size[0])
+        y1 = min(math.ceil(south_east.y + self.dirty_margin), self._size[1])
+        return (x0, y0, max(x1 - x0, 0), max(y1 - y0, 0))
+
+    # returns the rects to render again, or None if the whole frame must be
+    # rendered again: when the layout itself changed, when its elements were
+    # only reordered, or when the rects cover more than half of the frame; the
+    # rects are empty if the changed elements are all outside of the frame;
+    # unchanged elements are the same objects in consecutive snapshots, since
+    # builders reuse the objects they built if nothing changed
+    def _get_dirty_rects(self, layout):
+        previous_layout = self._previous_layout
+        if (
+            not self.incremental
+            or previous_layout is None
+            or layout.childless() != previous_layout.childless()
+        ):
+            return None
+        previous_ids = set(
+            [id(elem) for elem in previous_layout.layout_elements]
+        )
+        ids = set([id(elem) for elem in layout.layout_elements])
+        changed_elements = [
+            elem
+            for elem in previous_layout.layout_elements
+            if id(elem) not in ids
+        ]
+        changed_elements += [
+            elem
+            for elem in layout.layout_elements
+            if id(elem) not in previous_ids
+        ]
+        if not changed_elements:
+            return None
+        state = momapy.rendering.core.get_drawing_state(
+            layout, momapy.rendering.core.get_default_drawing_state()
+        )
+        transform = momapy.rendering.core.get_drawing_transform(layout, None)
+        rects = []
+        area = 0
+        for layout_element in changed_elements:
+            rect = self._get_dirty_rect(layout_element, state, transform)
+            if rect[2] > 0 and rect[3] > 0:
+                rects.append(rect)
+                area += rect[2] * rect[3]
+        if area > self._size[0] * self._size[1] / 2:
+            return None
+        return rects
 
     def frames(self, n_frames: int):
-        fimage = tempfile.mkstemp()
-        self._n_images += 1
-        momapy.rendering.render_layout(self.layout, fimage[1], format_="png")
-        for i in range(n_frames):
-            self._flimages[0].write(f"file '{fimage[1]}\n")
+        layout = self._get_layout_snapshot()
+        if self._size is None:
+            self._size = (int(layout.width), int(layout.height))
+        if self._previous_layout is None or (
+            layout is not self._previous_layout
+            and layout != self._previous_layout
+        ):
+            rects = self._get_dirty_rects(layout)
+            if rects is not None and not rects:
+                patches = None
+            elif self._n_workers == 1:
+                patches = _render_frame_patches(layout, self._size, rects)
+                self._n_images += 1
+            else:
+                patches = self._get_pool().submit(
+                    _render_frame_patches, layout, self._size, rects
+                )
+                self._n_images += 1
+            self._previous_layout = layout
+        else:
+            patches = None
+        self._pending.append((patches, n_frames))
+        if self._n_workers == 1:
+            max_pending = 0
+        else:
+            max_pending = self.max_queued_frames + self._n_workers
+        while len(self._pending) > max_pending:
+            self._output_pending_frame()
 
     def mseconds(self, n_mseconds: float):
         n_frames = round(n_mseconds / 1000 * self.fps)
         self.frames(n_frames)
 
-    def build(self, output_file, vcodec="libx264"):
-        self._flimages[0].close()
-        ffmpeg.input(
-            self._flimages[1], r=str(self.fps), f="concat", safe="0"
-        ).output(output_file, vcodec=vcodec).run(
-            quiet=True, overwrite_output=True
+    # frames are output in the order they were added; a new frame is the
+    # previous one with the rendered patches pasted on it, in a new array
+    # since the previous one may still be waiting to be written
+    def _output_pending_frame(self):
+        patches, n_frames = self._pending.popleft()
+        if isinstance(patches, concurrent.futures.Future):
+            patches = patches.result()
+        if patches:
+            frame = None
+            for x, y, patch in patches:
+                height, width = patch.shape[:2]
+                if (width, height) == self._size:
+                    frame = patch
+                else:
+                    if frame is None:
+                        frame = self._frame.copy()
+                    frame[y : y + height, x : x + width] = patch
+            self._frame = frame
+            if self.output_file is None:
+                self._frame_file_path = self._write_frame_file(frame)
+        if self.output_file is None:
+            for i in range(n_frames):
+                self._flimages[0].write(f"file '{self._frame_file_path}'\n")
+        elif n_frames > 0:
+            if self._process is None:
+                self._start_process()
+            self._check_writer()
+            self._queue.put((self._frame, n_frames))
+
+    def _write_frame_file(self, frame):
+        fd, file_path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        self._image_file_paths.append(file_path)
+        image = skia.Image.fromarray(
+            frame,
+            colorType=skia.ColorType.kRGBA_8888_ColorType,
+            alphaType=skia.AlphaType.kUnpremul_AlphaType,
+        )
+        image.save(file_path, skia.kPNG)
+        return file_path
+
+    def _start_process(self):
+        width, height = self._size
+        self._process = (
+            ffmpeg.input(
+                "pipe:",
+                format="rawvideo",
+                pix_fmt="rgba",
+                s=f"{width}x{height}",
+                r=str(self.fps),
+            )
+            .output(self.output_file, vcodec=self.vcodec)
+            .global_args("-loglevel", "error")
+            .overwrite_output()
+            .run_async(pipe_stdin=True)
         )
+        self._writer = threading.Thread(target=self._write_frames, daemon=True)
+        self._writer.start()
+
+    # the queue is drained even after a write failed, so that frames() never
+    # blocks on a full queue; the error is raised by the next call
+    def _write_frames(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._writer_error is not None:
+                continue
+            frame, n_frames = item
+            try:
+                for i in range(n_frames):
+                    self._process.stdin.write(frame)
+            except Exception as e:
+                self._writer_error = e
+
+    def _check_writer(self):
+        if self._writer_error is not None:
+            raise self._writer_error
+
+    def build(self, output_file=None, vcodec=None):
+        if self.output_file is not None:
+            if output_file is not None and output_file != self.output_file:
+                raise ValueError(
+                    f"the animation is streamed to '{self.output_file}'"
+                )
+        elif output_file is None:
+            raise ValueError("an output file must be given")
+        try:
+            while self._pending:
+                self._output_pending_frame()
+            if self.output_file is not None:
+                if self._process is not None:
+                    self._finish_process()
+            else:
+                if vcodec is None:
+                    vcodec = self.vcodec
+                self._flimages[0].close()
+                ffmpeg.input(
+                    self._flimages[1], r=str(self.fps), f="concat", safe="0"
+                ).output(output_file, vcodec=vcodec).run(
+                    quiet=True, overwrite_output=True
+                )
+        finally:
+            self.close()
+
+    def _finish_process(self):
+        self._queue.put(None)
+        self._writer.join()
+        process = self._process
+        self._process = None
+        process.stdin.close()
+        return_code = process.wait()
+        self._check_writer()
+        if return_code != 0:
+            raise ffmpeg.Error("ffmpeg", None, None)
+
+    # releases the worker processes, the ffmpeg process and the temporary files
+    # of the animator; an animation that is not built is discarded
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._pending.clear()
+        if self.output_file is None:
+            self._flimages[0].close()
+            for file_path in self._image_file_paths + [self._flimages[1]]:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            self._image_file_paths = []
+        elif self._process is not None:
+            self._process.kill()
+            self._queue.put(None)
+            self._writer.join()
+            self._process.wait()
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,13 +1,23 @@
 import abc
 import dataclasses
+import enum
 import typing
 import types
 import inspect
 
 
+# builders keep the object they were last built to, or made from, as _object;
+# build() returns it as is when the values of all fields, once built, are the
+# same objects as its own, so that only the modified parts of a builder tree,
+# and the path from them to the root, are rebuilt
 class Builder(abc.ABC):
     _cls_to_build: typing.ClassVar[type]
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_object", None)
+        return state
+
     @abc.abstractmethod
     def build(
         self, builder_object_mapping: dict[int, typing.Any] | None = None
@@ -23,24 +33,203 @@ class Builder(abc.ABC):
 
 
 builders = {}
+leaf_types = {int, float, complex, bool, str, bytes, type(None), enum.Enum}
+_is_leaf_type_cache = {}
+
+
+def register_leaf_type(type_):
+    leaf_types.add(type_)
+    _is_leaf_type_cache.clear()
+
+
+# instances of leaf types are immutable and have no builder, so they are
+# passed as is when building objects or making builders from objects
+def is_leaf_type(type_):
+    is_leaf = _is_leaf_type_cache.get(type_)
+    if is_leaf is None:
+        is_leaf = type_ in leaf_types or (
+            issubclass(type_, tuple(leaf_types))
+            and not issubclass(type_, Builder)
+            and type_ not in builders
+        )
+        _is_leaf_type_cache[type_] = is_leaf
+    return is_leaf
+
+
+def build_generic(
+    builder, builder_object_mapping: dict[int, typing.Any] | None = None
+):
+    if builder_object_mapping is not None:
+        obj = builder_object_mapping.get(id(builder))
+        if obj is not None:
+            return obj
+    else:
+        builder_object_mapping = {}
+    args = {}
+    for field_ in dataclasses.fields(builder):
+        attr_value = getattr(builder, field_.name)
+        args[field_.name] = object_from_builder(
+            attr_value, builder_object_mapping
+        )
+    obj = builder._cls_to_build(**args)
+    builder_object_mapping[id(builder)] = obj
+    return obj
+
+
+def from_object_generic(
+    builder_cls, obj, object_builder_mapping: dict[int, "Builder"] | None = None
+):
+    if object_builder_mapping is not None:
+        builder = object_builder_mapping.get(id(obj))
+        if builder is not None:
+            return builder
+    else:
+        object_builder_mapping = {}
+    args = {}
+    for field_ in dataclasses.fields(obj):
+        attr_value = getattr(obj, field_.name)
+        args[field_.name] = builder_from_object(
+            attr_value, object_builder_mapping
+        )
+    builder = builder_cls(**args)
+    object_builder_mapping[id(obj)] = builder
+    return builder
 
 
-def transform_type(type_, make_optional=False):
+_BUILD_TEMPLATE = """
+def build(self, builder_object_mapping=None):
+    if builder_object_mapping is not None:
+        obj = builder_object_mapping.get(id(self))
+        if obj is not None:
+            return obj
+    else:
+        builder_object_mapping = {{}}
+    previous_obj = self.__dict__.get("_object")
+{conversions}
+    if previous_obj is None:
+        obj = self._cls_to_build({args})
+        self.__dict__["_object"] = obj
+    else:
+        obj = previous_obj
+    builder_object_mapping[id(self)] = obj
+    return obj
+"""
+
+_BUILD_CONVERSION_TEMPLATE = """
+    value_{i} = self.{name}
+    if not is_leaf_type(value_{i}.__class__):
+        value_{i} = object_from_builder(value_{i}, builder_object_mapping)
+    if previous_obj is not None and value_{i} is not previous_obj.{name}:
+        previous_obj = None
+"""
+
+_FROM_OBJECT_TEMPLATE = """
+def from_object(cls, obj, object_builder_mapping=None):
+    if object_builder_mapping is not None:
+        builder = object_builder_mapping.get(id(obj))
+        if builder is not None:
+            return builder
+    else:
+        object_builder_mapping = {{}}
+{conversions}
+    builder = cls({args})
+    builder._object = obj
+    object_builder_mapping[id(obj)] = builder
+    return builder
+"""
+
+_FROM_OBJECT_CONVERSION_TEMPLATE = """
+    value_{i} = obj.{name}
+    if not is_leaf_type(value_{i}.__class__):
+        value_{i} = builder_from_object(value_{i}, object_builder_mapping)
+"""
+
+
+# generates a function with the conversion of each field unrolled, so that
+# leaf values are passed with a single check and no function call
+def _make_specialized_func(
+    func_name, template, conversion_template, field_names, qualname
+):
+    conversions = "".join(
+        [
+            conversion_template.format(i=i, name=field_name)
+            for i, field_name in enumerate(field_names)
+        ]
+    )
+    args = ", ".join(
+        [f"{field_name}=value_{i}" for i, field_name in enumerate(field_names)]
+    )
+    source = template.format(conversions=conversions, args=args)
+    namespace = {
+        "is_leaf_type": is_leaf_type,
+        "object_from_builder": object_from_builder,
+        "builder_from_object": builder_from_object,
+    }
+    exec(source, namespace)
+    func = namespace[func_name]
+    func.__qualname__ = qualname
+    return func
+
+
+# returns a function generating the specialized function the first time it is
+# called, which then replaces it on the builder class
+def _make_specializing_func(
+    func_name,
+    template,
+    conversion_template,
+    get_builder_cls,
+    get_field_names,
+    is_classmethod=False,
+):
+    def specializing_func(*args, **kwargs):
+        builder_cls = get_builder_cls()
+        func = _make_specialized_func(
+            func_name,
+            template,
+            conversion_template,
+            get_field_names(),
+            f"{builder_cls.__qualname__}.{func_name}",
+        )
+        if is_classmethod:
+            setattr(builder_cls, func_name, classmethod(func))
+        else:
+            setattr(builder_cls, func_name, func)
+        return func(*args, **kwargs)
+
+    specializing_func.__name__ = func_name
+    return specializing_func
+
+
+# with make_builders=False, types are replaced by their builders only if these
+# already exist, so that making a builder class does not make the builder
+# classes of all the types its fields refer to
+def transform_type(type_, make_optional=False, make_builders=True):
+    if make_builders:
+        get_builder_cls = get_or_make_builder_cls
+    else:
+        get_builder_cls = get_builder
     o_type = typing.get_origin(type_)  # returns None if not supported
     if o_type is not None:
         if isinstance(o_type, type):  # o_type is a type
             if o_type == types.UnionType:  # from t1 | t2 syntax
                 new_o_type = typing.Union
             else:
-                new_o_type = get_or_make_builder_cls(o_type)
+                new_o_type = get_builder_cls(o_type)
+                if new_o_type is None:
+                    new_o_type = o_type
         else:  # o_type is an object from typing
             new_o_type = o_type
         new_type = new_o_type[
-            tuple([transform_type(a_type) for a_type in typing.get_args(type_)])
+            tuple(
+                [
+                    transform_type(a_type, make_builders=make_builders)
+                    for a_type in typing.get_args(type_)
+                ]
+            )
         ]
     else:  # type_ has no origin
         if isinstance(type_, type):  # type_ is a type
-            new_type = get_or_make_builder_cls(type_)
+            new_type = get_builder_cls(type_)
             if new_type is None:
                 new_type = type_
         else:
@@ -53,48 +242,19 @@ def transform_type(type_, make_optional=False):
 def make_builder_cls(
     cls, builder_fields=None, builder_bases=None, builder_namespace=None
 ):
-    def _builder_build(
-        self, builder_object_mapping: dict[int, typing.Any] | None = None
-    ):
-        if builder_object_mapping is not None:
-            obj = builder_object_mapping.get(id(self))
-            if obj is not None:
-                return obj
-        else:
-            builder_object_mapping = {}
-        args = {}
-        for field_ in dataclasses.fields(self):
-            attr_value = getattr(self, field_.name)
-            args[field_.name] = object_from_builder(
-                attr_value, builder_object_mapping
-            )
-        obj = self._cls_to_build(**args)
-        builder_object_mapping[id(self)] = obj
-        return obj
-
-    def _builder_from_object(
-        cls, obj, object_builder_mapping: dict[int, "Builder"] | None = None
-    ):
-        if object_builder_mapping is not None:
-            builder = object_builder_mapping.get(id(obj))
-            if builder is not None:
-                return builder
-        else:
-            object_builder_mapping = {}
-        args = {}
-        for field_ in dataclasses.fields(obj):
-            attr_value = getattr(obj, field_.name)
-            args[field_.name] = builder_from_object(
-                attr_value, object_builder_mapping
-            )
-        builder = cls(**args)
-        object_builder_mapping[id(obj)] = builder
-        return builder
-
     def _builder_add_element(self, element, fields_for_add_element):
         added = False
         for field_ in fields_for_add_element:
-            if isinstance(element, field_["a_types"]):
+            a_types = field_.get("a_types")
+            if a_types is None:  # builders of the types made on first use
+                a_types = tuple(
+                    [
+                        transform_type(a_type)
+                        for a_type in typing.get_args(field_["field_type"])
+                    ]
+                )
+                field_["a_types"] = a_types
+            if isinstance(element, a_types):
                 attr = getattr(self, field_["field_name"])
                 if hasattr(attr, "append"):
                     attr.append(element)
@@ -130,7 +290,7 @@ def make_builder_cls(
             if not has_default:
                 field_dict["default"] = None
             field_type = transform_type(
-                field_.type, make_optional=not has_default
+                field_.type, make_optional=not has_default, make_builders=False
             )
             builder_fields.append(
                 (field_name, field_type, dataclasses.field(**field_dict))
@@ -144,13 +304,10 @@ def make_builder_cls(
                 fields_for_add_element.append(
                     {
                         "field_name": field_name,
-                        "field_type": field_type,
-                        "a_types": typing.get_args(field_type),
+                        "field_type": field_.type,
                     }
                 )
 
-    builder_namespace["build"] = _builder_build
-    builder_namespace["from_object"] = classmethod(_builder_from_object)
     builder_namespace["_cls_to_build"] = cls
 
     if fields_for_add_element:
@@ -168,6 +325,24 @@ def make_builder_cls(
 
             builder_namespace[func_name] = func
 
+    builder_namespace["build"] = _make_specializing_func(
+        "build",
+        _BUILD_TEMPLATE,
+        _BUILD_CONVERSION_TEMPLATE,
+        lambda: builder,
+        lambda: [field_.name for field_ in dataclasses.fields(builder)],
+    )
+    builder_namespace["from_object"] = classmethod(
+        _make_specializing_func(
+            "from_object",
+            _FROM_OBJECT_TEMPLATE,
+            _FROM_OBJECT_CONVERSION_TEMPLATE,
+            lambda: builder,
+            lambda: [field_.name for field_ in cls_fields],
+            is_classmethod=True,
+        )
+    )
+
     cls_bases = [
         get_or_make_builder_cls(base_cls) for base_cls in cls.__bases__
     ]
@@ -197,6 +372,8 @@ def make_builder_cls(
 def object_from_builder(
     builder, builder_object_mapping: dict[int, typing.Any] | None = None
 ):
+    if is_leaf_type(type(builder)):
+        return builder
     if builder_object_mapping is not None:
         if id(builder) in builder_object_mapping:
             return builder_object_mapping[id(builder)]
@@ -211,21 +388,166 @@ def object_from_builder(
 
 
 def builder_from_object(
-    obj, object_builder_mapping: dict[int, "Builder"] | None = None
+    obj,
+    object_builder_mapping: dict[int, "Builder"] | None = None,
+    lazy=False,
 ):
+    if is_leaf_type(type(obj)):
+        return obj
     if object_builder_mapping is not None:
         builder = object_builder_mapping.get(id(obj))
         if builder is not None:
             return builder
+    elif lazy:
+        object_builder_mapping = LazyObjectBuilderMapping()
     else:
         object_builder_mapping = {}
     cls = get_or_make_builder_cls(type(obj))
     if issubclass(cls, Builder):
+        if isinstance(
+            object_builder_mapping, LazyObjectBuilderMapping
+        ) and dataclasses.is_dataclass(cls):
+            return _make_lazy_builder(cls, obj, object_builder_mapping)
         return cls.from_object(obj, object_builder_mapping)
     else:
         return obj
 
 
+# copy-on-write builders: the fields of a lazy builder keep the values of the
+# object it was made from until they are first accessed or set, at which point
+# they are converted to (lazy) builders sharing the same object-builder mapping;
+# fields never accessed are reused as is when building, unless they are, or are
+# a collection holding, objects converted elsewhere
+class LazyObjectBuilderMapping(dict):
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return type(self)()
+
+
+class _LazyField(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, builder, owner=None):
+        if builder is None:
+            return self
+        builder_dict = builder.__dict__
+        value = builder_dict[self.name]
+        pending_field_names = builder_dict.get("_pending_field_names")
+        if pending_field_names and self.name in pending_field_names:
+            pending_field_names.discard(self.name)
+            value = builder_from_object(
+                value, builder_dict["_object_builder_mapping"]
+            )
+            builder_dict[self.name] = value
+        return value
+
+    def __set__(self, builder, value):
+        builder_dict = builder.__dict__
+        builder_dict[self.name] = value
+        pending_field_names = builder_dict.get("_pending_field_names")
+        if pending_field_names:
+            pending_field_names.discard(self.name)
+
+
+def _get_pending_value_builder(value, object_builder_mapping):
+    if not object_builder_mapping:
+        return None
+    builder = object_builder_mapping.get(id(value))
+    if builder is not None:
+        return builder
+    if isinstance(value, typing.Mapping):
+        items = list(value.keys()) + list(value.values())
+    elif isinstance(value, (tuple, frozenset)):
+        items = value
+    else:
+        return None
+    for item in items:
+        if id(item) in object_builder_mapping:
+            return builder_from_object(value, object_builder_mapping)
+    return None
+
+
+def _lazy_builder_build(
+    self, builder_object_mapping: dict[int, typing.Any] | None = None
+):
+    if builder_object_mapping is not None:
+        obj = builder_object_mapping.get(id(self))
+        if obj is not None:
+            return obj
+    else:
+        builder_object_mapping = {}
+    builder_dict = self.__dict__
+    previous_obj = builder_dict.get("_object")
+    pending_field_names = builder_dict.get("_pending_field_names", ())
+    object_builder_mapping = builder_dict.get("_object_builder_mapping")
+    args = {}
+    for field_name in self._lazy_field_names:
+        value = builder_dict[field_name]
+        if not is_leaf_type(value.__class__):
+            if field_name in pending_field_names:
+                builder = _get_pending_value_builder(
+                    value, object_builder_mapping
+                )
+                if builder is not None:  # kept, as mappings are keyed by id
+                    builder_dict[field_name] = builder
+                    pending_field_names.discard(field_name)
+                    value = object_from_builder(builder, builder_object_mapping)
+            else:
+                value = object_from_builder(value, builder_object_mapping)
+        if previous_obj is not None and value is not getattr(
+            previous_obj, field_name
+        ):
+            previous_obj = None
+        args[field_name] = value
+    if previous_obj is None:
+        obj = self._cls_to_build(**args)
+        builder_dict["_object"] = obj
+    else:
+        obj = previous_obj
+    builder_object_mapping[id(self)] = obj
+    return obj
+
+
+lazy_builders = {}
+
+
+def get_or_make_lazy_builder_cls(builder_cls):
+    lazy_builder_cls = lazy_builders.get(builder_cls)
+    if lazy_builder_cls is None:
+        field_names = tuple(
+            [field_.name for field_ in dataclasses.fields(builder_cls)]
+        )
+        namespace = {
+            field_name: _LazyField(field_name) for field_name in field_names
+        }
+        namespace["_lazy_field_names"] = field_names
+        namespace["build"] = _lazy_builder_build
+        # same name as the builder class, as style sheets select by class name
+        lazy_builder_cls = type(builder_cls.__name__, (builder_cls,), namespace)
+        lazy_builder_cls.__qualname__ = builder_cls.__qualname__
+        lazy_builder_cls.__module__ = builder_cls.__module__
+        lazy_builders[builder_cls] = lazy_builder_cls
+    return lazy_builder_cls
+
+
+def _make_lazy_builder(builder_cls, obj, object_builder_mapping):
+    lazy_builder_cls = get_or_make_lazy_builder_cls(builder_cls)
+    builder = lazy_builder_cls.__new__(lazy_builder_cls)
+    builder_dict = builder.__dict__
+    for field_name in lazy_builder_cls._lazy_field_names:
+        builder_dict[field_name] = getattr(obj, field_name)
+    builder_dict["_pending_field_names"] = set(
+        lazy_builder_cls._lazy_field_names
+    )
+    builder_dict["_object"] = obj
+    builder_dict["_object_builder_mapping"] = object_builder_mapping
+    object_builder_mapping[id(obj)] = builder
+    return builder
+
+
 def new_builder(cls, *args, **kwargs):
     if not issubclass(cls, Builder):
         cls = get_or_make_builder_cls(cls)
@@ -257,17 +579,49 @@ def get_builder(cls):
 
 def register_builder(builder_cls):
     builders[builder_cls._cls_to_build] = builder_cls
+    _is_leaf_type_cache.clear()
+    _clear_type_check_caches()
+
+
+# results of isinstance_or_builder and issubclass_or_builder, keyed by class and
+# type(s); cleared whenever a builder is registered
+_types_or_builders_cache = {}
+_subclass_or_builder_cache = {}
+
+
+def _clear_type_check_caches():
+    _types_or_builders_cache.clear()
+    _subclass_or_builder_cache.clear()
+
+
+def _get_types_or_builders(type_):
+    types_or_builders = _types_or_builders_cache.get(type_)
+    if types_or_builders is None:
+        if isinstance(type_, type):
+            types_ = (type_,)
+        else:
+            types_ = tuple(type_)
+        types_or_builders = types_ + tuple(
+            [get_or_make_builder_cls(t) for t in types_]
+        )
+        _types_or_builders_cache[type_] = types_or_builders
+    return types_or_builders
 
 
 def isinstance_or_builder(obj, type_):
-    if isinstance(type_, type):
-        type_ = (type_,)
-    type_ += tuple([get_or_make_builder_cls(t) for t in type_])
-    return isinstance(obj, type_)
+    try:
+        return _subclass_or_builder_cache[(obj.__class__, type_)]
+    except (KeyError, TypeError):
+        return issubclass_or_builder(obj.__class__, type_)
 
 
 def issubclass_or_builder(cls, type_):
-    if isinstance(type_, type):
-        type_ = (type_,)
-    type_ += tuple([get_or_make_builder_cls(t) for t in type_])
-    return issubclass(cls, type_)
+    key = (cls, type_)
+    try:
+        return _subclass_or_builder_cache[key]
+    except KeyError:
+        is_subclass = issubclass(cls, _get_types_or_builders(type_))
+        _subclass_or_builder_cache[key] = is_subclass
+        return is_subclass
+    except TypeError:  # unhashable type_, e.g. a list of types
+        return issubclass(cls, _get_types_or_builders(tuple(type_)))
@@ -0,0 +1,152 @@
+import collections
+import dataclasses
+import functools
+import threading
+
+import momapy.builder
+
+enabled = True
+
+
+@dataclasses.dataclass
+class CacheInfo(object):
+    hits: int = 0
+    misses: int = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+
+cache_infos: dict[str, CacheInfo] = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def is_enabled():
+    return enabled
+
+
+def get_cache_info(name):
+    return cache_infos.get(name)
+
+
+def get_cache_infos():
+    return dict(cache_infos)
+
+
+def reset_cache_infos():
+    for cache_info in cache_infos.values():
+        cache_info.reset()
+
+
+def _is_cacheable(obj):
+    if isinstance(obj, momapy.builder.Builder):
+        return False
+    dataclass_params = getattr(type(obj), "__dataclass_params__", None)
+    return dataclass_params is not None and dataclass_params.frozen
+
+
+def _get_obj_cache(obj):
+    obj_cache = obj.__dict__.get("_cache")
+    if obj_cache is None:
+        obj_cache = {}
+        object.__setattr__(obj, "_cache", obj_cache)
+    return obj_cache
+
+
+def clear_cache(obj):
+    obj.__dict__.pop("_cache", None)
+
+
+def cached_method(func):
+    name = func.__qualname__
+    cache_info = CacheInfo()
+    cache_infos[name] = cache_info
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not enabled or not _is_cacheable(self):
+            return func(self, *args, **kwargs)
+        key = (name, args, tuple(sorted(kwargs.items())))
+        obj_cache = _get_obj_cache(self)
+        try:
+            value = obj_cache[key]
+        except KeyError:
+            cache_info.misses += 1
+            value = func(self, *args, **kwargs)
+            obj_cache[key] = value
+        else:
+            cache_info.hits += 1
+        if isinstance(value, list):  # callers may extend the returned list
+            return list(value)
+        return value
+
+    wrapper.cache_info = cache_info
+    return wrapper
+
+
+class LRUCache(object):
+    def __init__(self, name, max_size=1024):
+        self.name = name
+        self.max_size = max_size
+        self.cache_info = CacheInfo()
+        cache_infos[name] = self.cache_info
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if not enabled:
+            return default
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.cache_info.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.cache_info.hits += 1
+            return value
+
+    def set(self, key, value):
+        if not enabled or self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        if self.max_size is not None:
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def set_max_size(self, max_size):
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.cache_info.reset()
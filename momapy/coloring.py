@@ -1,5 +1,7 @@
 from dataclasses import dataclass, replace
 
+import momapy.builder
+
 
 @dataclass(frozen=True)
 class Color(object):
@@ -67,6 +69,9 @@ class Color(object):
         return cls(red, green, blue, alpha)
 
 
+momapy.builder.register_leaf_type(Color)
+
+
 def list_colors():
     for color_name, color in globals().items():
         if isinstance(color, Color):
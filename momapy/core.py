@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field, fields, replace
 from frozendict import frozendict
 from typing import Optional, Union, Any
 from uuid import uuid4
@@ -7,21 +7,35 @@ from enum import Enum
 import math
 import collections
 import copy
-
-import shapely
-
-import cairo
-
-import gi
-
-gi.require_version("Pango", "1.0")
-gi.require_version("PangoCairo", "1.0")
-from gi.repository import Pango, PangoCairo
+import threading
 
 import momapy.drawing
 import momapy.geometry
 import momapy.coloring
 import momapy.builder
+import momapy.caching
+import momapy.indexing
+import momapy.utils
+
+
+def _require_pango_versions():
+    import gi
+
+    gi.require_version("Pango", "1.0")
+    gi.require_version("PangoCairo", "1.0")
+
+
+# loaded on first use, so that working with maps without measuring text or
+# computing geometries does not require the backends
+numpy = momapy.utils.lazy_import("numpy")
+shapely = momapy.utils.lazy_import("shapely")
+cairo = momapy.utils.lazy_import("cairo")
+Pango = momapy.utils.lazy_import(
+    "gi.repository.Pango", before_import=_require_pango_versions
+)
+PangoCairo = momapy.utils.lazy_import(
+    "gi.repository.PangoCairo", before_import=_require_pango_versions
+)
 
 
 class Direction(Enum):
@@ -57,6 +71,12 @@ class ModelElement(MapElement):
 
 @dataclass(frozen=True, kw_only=True)
 class LayoutElement(MapElement):
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_cache", None)
+        return state
+
+    @momapy.caching.cached_method
     def bbox(self) -> momapy.geometry.Bbox:
         bounds = self.to_shapely().bounds
         return momapy.geometry.Bbox.from_bounds(bounds)
@@ -104,6 +124,7 @@ class LayoutElement(MapElement):
     def contains(self, other):
         return other in self.descendants()
 
+    @momapy.caching.cached_method
     def to_shapely(self, to_polygons=False):
         geom_collection = []
         for drawing_element in self.drawing_elements():
@@ -113,6 +134,68 @@ class LayoutElement(MapElement):
         return shapely.GeometryCollection(geom_collection)
 
 
+# measured line breaks and extents of text layouts, shared by all text layouts
+# with the same text, font and box; extents are (x, y, width, height) in pixels
+# and lines are (text, (x, baseline_y)) relative to the layout origin
+@dataclass(frozen=True)
+class _TextMeasurement(object):
+    ink_extents: tuple[float, float, float, float]
+    logical_extents: tuple[float, float, float, float]
+    lines: tuple[tuple[str, tuple[float, float]]]
+
+
+def _get_extents_tuple(pango_rectangle):
+    return (
+        pango_rectangle.x,
+        pango_rectangle.y,
+        pango_rectangle.width,
+        pango_rectangle.height,
+    )
+
+
+# one per thread, since Pango contexts and font maps are not thread-safe
+class TextShapingContext(threading.local):
+    def __init__(self):
+        self.cairo_surface = None
+        self.cairo_context = None
+        self.pango_context = None
+        self.pango_font_map = None
+        self.pango_font_descriptions = {}
+
+    def _get_pango_context(self):
+        if self.pango_context is None:
+            self.cairo_surface = cairo.RecordingSurface(
+                cairo.CONTENT_COLOR_ALPHA, None
+            )
+            self.cairo_context = cairo.Context(self.cairo_surface)
+            self.pango_context = PangoCairo.create_context(self.cairo_context)
+            self.pango_font_map = self.pango_context.get_font_map()
+        return self.pango_context
+
+    def get_pango_font_description(self, font_family, font_size):
+        key = (font_family, font_size)
+        pango_font_description = self.pango_font_descriptions.get(key)
+        if pango_font_description is None:
+            pango_font_description = Pango.FontDescription()
+            pango_font_description.set_family(font_family)
+            pango_font_description.set_absolute_size(
+                Pango.units_from_double(font_size)
+            )
+            self.pango_font_descriptions[key] = pango_font_description
+        return pango_font_description
+
+    def new_pango_layout(self):
+        return Pango.Layout.new(self._get_pango_context())
+
+
+text_shaping_context = TextShapingContext()
+
+
+text_measurement_cache = momapy.caching.LRUCache(
+    "TextLayout.measurement", max_size=4096
+)
+
+
 @dataclass(frozen=True, kw_only=True)
 class TextLayout(LayoutElement):
     text: str
@@ -135,16 +218,14 @@ class TextLayout(LayoutElement):
         return self.position.y
 
     def _make_pango_layout(self):
-        cairo_surface = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
-        cairo_context = cairo.Context(cairo_surface)
-        pango_layout = PangoCairo.create_layout(cairo_context)
+        pango_layout = text_shaping_context.new_pango_layout()
         pango_layout.set_alignment(
             getattr(Pango.Alignment, self.horizontal_alignment.name)
         )
-        pango_font_description = Pango.FontDescription()
-        pango_font_description.set_family(self.font_family)
-        pango_font_description.set_absolute_size(
-            Pango.units_from_double(self.font_size)
+        pango_font_description = (
+            text_shaping_context.get_pango_font_description(
+                self.font_family, self.font_size
+            )
         )
         pango_layout.set_font_description(pango_font_description)
         if self.width is not None:
@@ -165,78 +246,102 @@ class TextLayout(LayoutElement):
         x = pos.x
         y = round(Pango.units_to_double(pango_layout_iter.get_baseline()))
         line_text = self.text[start_index:end_index]
-        return line_text, momapy.geometry.Point(x, y)
+        return line_text, (x, y)
+
+    def _make_text_measurement(self):
+        pango_layout = self._make_pango_layout()
+        pango_ink_extents, pango_logical_extents = (
+            pango_layout.get_pixel_extents()
+        )
+        lines = []
+        pango_layout_iter = pango_layout.get_iter()
+        done = False
+        while not done:
+            pango_line = pango_layout_iter.get_line()
+            line_text, pos = self._get_pango_line_text_and_initial_pos(
+                pango_layout, pango_layout_iter, pango_line
+            )
+            lines.append((line_text, pos))
+            if pango_layout_iter.at_last_line():
+                done = True
+            else:
+                pango_layout_iter.next_line()
+        return _TextMeasurement(
+            ink_extents=_get_extents_tuple(pango_ink_extents),
+            logical_extents=_get_extents_tuple(pango_logical_extents),
+            lines=tuple(lines),
+        )
+
+    def _get_text_measurement_key(self):
+        return (
+            self.text,
+            self.font_family,
+            self.font_size,
+            self.width,
+            self.height,
+            self.horizontal_alignment,
+            self.justify,
+        )
 
-    def _get_tx_and_ty(self, pango_layout):
-        _, pango_layout_extents = pango_layout.get_pixel_extents()
+    def _get_text_measurement(self):
+        key = self._get_text_measurement_key()
+        text_measurement = text_measurement_cache.get(key)
+        if text_measurement is None:
+            text_measurement = self._make_text_measurement()
+            text_measurement_cache.set(key, text_measurement)
+        return text_measurement
+
+    def _get_tx_and_ty(self, text_measurement):
+        x, y, width, height = text_measurement.logical_extents
         if self.width is not None:
             tx = self.x - self.width / 2
         else:
-            tx = self.x - (
-                pango_layout_extents.x + pango_layout_extents.width / 2
-            )
+            tx = self.x - (x + width / 2)
         if self.height is not None:
             if self.vertical_alignment == VAlignment.TOP:
                 ty = self.y - self.height / 2
             elif self.vertical_alignment == VAlignment.BOTTOM:
-                ty = self.y + self.height / 2 - pango_layout_extents.height
+                ty = self.y + self.height / 2 - height
             else:
-                ty = self.y - (
-                    pango_layout_extents.y + pango_layout_extents.height / 2
-                )
+                ty = self.y - (y + height / 2)
         else:
-            ty = self.y - (
-                pango_layout_extents.y + pango_layout_extents.height / 2
-            )
+            ty = self.y - (y + height / 2)
         return tx, ty
 
-    def _get_bbox(self, pango_layout, pango_layout_extents):
-        position = momapy.geometry.Point(
-            pango_layout_extents.x + pango_layout_extents.width / 2,
-            pango_layout_extents.y + pango_layout_extents.height / 2,
-        )
-        tx, ty = self._get_tx_and_ty(pango_layout)
+    def _get_bbox(self, text_measurement, extents):
+        x, y, width, height = extents
+        tx, ty = self._get_tx_and_ty(text_measurement)
         return momapy.geometry.Bbox(
-            position + (tx, ty),
-            pango_layout_extents.width,
-            pango_layout_extents.height,
+            momapy.geometry.Point(x + width / 2 + tx, y + height / 2 + ty),
+            width,
+            height,
         )
 
     def logical_bbox(self):
-        pango_layout = self._make_pango_layout()
-        _, pango_layout_extents = pango_layout.get_pixel_extents()
-        return self._get_bbox(pango_layout, pango_layout_extents)
+        text_measurement = self._get_text_measurement()
+        return self._get_bbox(
+            text_measurement, text_measurement.logical_extents
+        )
 
     def ink_bbox(self):
-        pango_layout = self._make_pango_layout()
-        pango_layout_extents, _ = pango_layout.get_pixel_extents()
-        return self._get_bbox(pango_layout, pango_layout_extents)
+        text_measurement = self._get_text_measurement()
+        return self._get_bbox(text_measurement, text_measurement.ink_extents)
 
+    @momapy.caching.cached_method
     def drawing_elements(self):
         drawing_elements = []
-        pango_layout = self._make_pango_layout()
-        pango_layout_iter = pango_layout.get_iter()
-        tx, ty = self._get_tx_and_ty(pango_layout)
-        done = False
-        while not done:
-            pango_line = pango_layout_iter.get_line()
-            line_text, pos = self._get_pango_line_text_and_initial_pos(
-                pango_layout, pango_layout_iter, pango_line
-            )
-            pos += (tx, ty)
+        text_measurement = self._get_text_measurement()
+        tx, ty = self._get_tx_and_ty(text_measurement)
+        for line_text, (x, y) in text_measurement.lines:
             text = momapy.drawing.Text(
                 text=line_text,
                 font_family=self.font_family,
                 font_size=self.font_size,
                 fill=self.font_color,
                 stroke=momapy.drawing.NoneValue,
-                position=pos,
+                position=momapy.geometry.Point(x + tx, y + ty),
             )
             drawing_elements.append(text)
-            if pango_layout_iter.at_last_line():
-                done = True
-            else:
-                pango_layout_iter.next_line()
         return drawing_elements
 
     def children(self):
@@ -296,6 +401,7 @@ class GroupLayout(LayoutElement):
         Union[momapy.drawing.NoneValueType, momapy.drawing.Filter]
     ] = None  # not inherited
 
+    @momapy.caching.cached_method
     def self_to_shapely(self, to_polygons=False):
         geom_collection = []
         for drawing_element in self.self_drawing_elements():
@@ -304,6 +410,7 @@ class GroupLayout(LayoutElement):
             ).geoms
         return shapely.GeometryCollection(geom_collection)
 
+    @momapy.caching.cached_method
     def self_bbox(self) -> momapy.geometry.Bbox:
         bounds = self.self_to_shapely().bounds
         return momapy.geometry.Bbox.from_bounds(bounds)
@@ -316,6 +423,7 @@ class GroupLayout(LayoutElement):
     def self_children(self) -> list[LayoutElement]:
         pass
 
+    @momapy.caching.cached_method
     def drawing_elements(self):
         drawing_elements = self.self_drawing_elements()
         for child in self.children():
@@ -336,6 +444,12 @@ class GroupLayout(LayoutElement):
     def children(self):
         return self.self_children() + list(self.layout_elements)
 
+    @momapy.caching.cached_method
+    def spatial_index(self, descendants=True) -> momapy.indexing.SpatialIndex:
+        return momapy.indexing.SpatialIndex.from_layout_element(
+            self, descendants=descendants
+        )
+
     def childless(self):
         return replace(self, layout_elements=None)
 
@@ -346,6 +460,26 @@ class GroupLayout(LayoutElement):
         return replace(self, layout_elements=layout_elements)
 
 
+border_drawing_element_cache = momapy.caching.LRUCache(
+    "NodeLayout.border_drawing_elements", max_size=4096
+)
+_border_drawing_element_field_names = {}
+_no_border_drawing_element = object()
+
+
+def _has_transform(drawing_element):
+    if (
+        drawing_element.transform is not None
+        and drawing_element.transform is not momapy.drawing.NoneValue
+    ):
+        return True
+    if isinstance(drawing_element, momapy.drawing.Group):
+        for element in drawing_element.elements:
+            if _has_transform(element):
+                return True
+    return False
+
+
 @dataclass(frozen=True, kw_only=True)
 class NodeLayout(GroupLayout):
     position: momapy.geometry.Point
@@ -365,8 +499,58 @@ class NodeLayout(GroupLayout):
     def border_drawing_element(self) -> Optional[momapy.drawing.DrawingElement]:
         pass
 
+    # the border of a node only depends on its position through a translation:
+    # it is made once at the origin for each node class, size and style, and
+    # translated to the position of each node; borders holding a transform are
+    # made at the position of each node instead, since a transform may depend
+    # on the position and is not taken into account by bboxes
+    def _get_border_drawing_element_key(self):
+        field_names = _border_drawing_element_field_names.get(type(self))
+        if field_names is None:
+            field_names = tuple(
+                [
+                    field_.name
+                    for field_ in fields(self)
+                    if field_.compare
+                    and field_.name
+                    not in ("position", "label", "layout_elements")
+                ]
+            )
+            _border_drawing_element_field_names[type(self)] = field_names
+        return (type(self),) + tuple(
+            [getattr(self, field_name) for field_name in field_names]
+        )
+
+    def _get_border_drawing_element(self):
+        if not momapy.caching.enabled or not momapy.caching._is_cacheable(self):
+            return self.border_drawing_element()
+        key = self._get_border_drawing_element_key()
+        try:
+            border_drawing_element = border_drawing_element_cache.get(
+                key, _no_border_drawing_element
+            )
+        except TypeError:  # fields holding builders are not hashable
+            return self.border_drawing_element()
+        if border_drawing_element is _no_border_drawing_element:
+            border_drawing_element = replace(
+                self,
+                position=momapy.geometry.Point(0.0, 0.0),
+                label=None,
+                layout_elements=tuple(),
+            ).border_drawing_element()
+            if border_drawing_element is not None and _has_transform(
+                border_drawing_element
+            ):
+                border_drawing_element = _no_border_drawing_element
+            border_drawing_element_cache.set(key, border_drawing_element)
+        if border_drawing_element is _no_border_drawing_element:
+            return self.border_drawing_element()
+        if border_drawing_element is None:
+            return None
+        return border_drawing_element.translated(self.x, self.y)
+
     def self_drawing_elements(self):
-        border_drawing_element = self.border_drawing_element()
+        border_drawing_element = self._get_border_drawing_element()
         if border_drawing_element is not None:
             return [border_drawing_element]
         return []
@@ -458,10 +642,91 @@ class NodeLayout(GroupLayout):
                     intersection_point = candidate_point
         return intersection_point
 
+    # analytic description of the border drawing element as a tuple
+    # (segments, elliptical_arcs), with segments as (x1, y1, x2, y2) tuples
+    # and elliptical arcs as (cx, cy, rx, ry, sx, sy) tuples, an elliptical arc
+    # being the part of its ellipse in the direction (sx, sy) from its center;
+    # None if the border has no analytic description
+    def _self_border_primitives(self):
+        return None
+
+    @momapy.caching.cached_method
+    def _border_primitives(self):
+        primitives = self._self_border_primitives()
+        if primitives is None:
+            return None
+        segments = list(primitives[0])
+        elliptical_arcs = list(primitives[1])
+        for child in self.children():
+            if momapy.builder.isinstance_or_builder(child, TextLayout):
+                continue
+            if not momapy.builder.isinstance_or_builder(child, NodeLayout):
+                return None
+            child_primitives = child._border_primitives()
+            if child_primitives is None:
+                return None
+            segments += child_primitives[0]
+            elliptical_arcs += child_primitives[1]
+        return (segments, elliptical_arcs)
+
+    def _border_from_primitives(self, primitives, point):
+        if primitives is None:
+            return None
+        line = momapy.geometry.Line(self.center(), point)
+        if line.p1.x == line.p2.x and line.p1.y == line.p2.y:
+            return None
+        segments, elliptical_arcs = primitives
+        parameters = []
+        for x1, y1, x2, y2 in segments:
+            segment = momapy.geometry.Segment(
+                momapy.geometry.Point(x1, y1), momapy.geometry.Point(x2, y2)
+            )
+            parameters += (
+                momapy.geometry.get_intersection_parameters_of_line_and_segment(
+                    line, segment
+                )
+            )
+        for cx, cy, rx, ry, sx, sy in elliptical_arcs:
+            ellipse_parameters = (
+                momapy.geometry.get_intersection_parameters_of_line_and_ellipse(
+                    line, momapy.geometry.Point(cx, cy), rx, ry
+                )
+            )
+            for parameter in ellipse_parameters:
+                intersection_point = (
+                    momapy.geometry.get_point_of_line_at_parameter(
+                        line, parameter
+                    )
+                )
+                if (intersection_point.x - cx) * sx >= 0 and (
+                    intersection_point.y - cy
+                ) * sy >= 0:
+                    parameters.append(parameter)
+        if not parameters:
+            return None
+        ok_direction_parameters = [
+            parameter for parameter in parameters if parameter >= 0
+        ]
+        if ok_direction_parameters:
+            parameter = max(ok_direction_parameters)
+        else:
+            parameter = min(parameters)
+        return momapy.geometry.get_point_of_line_at_parameter(line, parameter)
+
     def self_border(self, point) -> momapy.geometry.Point:
+        border_point = self._border_from_primitives(
+            self._self_border_primitives(), point
+        )
+        if border_point is not None:
+            return border_point
         return self._border_from_shapely(self.self_to_shapely(), point)
 
     def border(self, point) -> momapy.geometry.Point:
+        border_point = self._border_from_primitives(
+            self._border_primitives(), point
+        )
+        if border_point is not None:
+            return border_point
         return self._border_from_shapely(self.to_shapely(), point)
 
     def _make_point_for_angle(self, angle, unit="degrees"):
@@ -494,6 +759,100 @@ class NodeLayout(GroupLayout):
         return replace(self, label=label, layout_elements=layout_elements)
 
 
+def get_borders(
+    layout_elements, points, self_border=False
+) -> list[momapy.geometry.Point]:
+    n_queries = len(layout_elements)
+    origins = numpy.zeros((n_queries, 2))
+    directions = numpy.zeros((n_queries, 2))
+    segments = []
+    n_segments = numpy.zeros(n_queries, dtype=int)
+    elliptical_arcs = []
+    n_elliptical_arcs = numpy.zeros(n_queries, dtype=int)
+    fallback_indices = set()
+    layout_element_primitives = {}  # computed once per node
+    for i, (layout_element, point) in enumerate(zip(layout_elements, points)):
+        center = layout_element.center()
+        origins[i] = (center.x, center.y)
+        directions[i] = (point.x - center.x, point.y - center.y)
+        primitives = layout_element_primitives.get(id(layout_element))
+        if primitives is None:
+            if self_border:
+                primitives = layout_element._self_border_primitives()
+            else:
+                primitives = layout_element._border_primitives()
+            if primitives is not None:
+                primitives = (
+                    numpy.array(primitives[0], dtype=float).reshape((-1, 4)),
+                    numpy.array(primitives[1], dtype=float).reshape((-1, 6)),
+                )
+            else:
+                primitives = (None, None)
+            layout_element_primitives[id(layout_element)] = primitives
+        if primitives[0] is None or not directions[i].any():
+            fallback_indices.add(i)
+            continue
+        segments.append(primitives[0])
+        n_segments[i] = len(primitives[0])
+        elliptical_arcs.append(primitives[1])
+        n_elliptical_arcs[i] = len(primitives[1])
+    segments = numpy.concatenate(segments + [numpy.empty((0, 4))])
+    segment_indices = numpy.repeat(numpy.arange(n_queries), n_segments)
+    elliptical_arcs = numpy.concatenate(elliptical_arcs + [numpy.empty((0, 6))])
+    elliptical_arc_indices = numpy.repeat(
+        numpy.arange(n_queries), n_elliptical_arcs
+    )
+    parameters = numpy.concatenate(
+        [
+            momapy.geometry.get_intersection_parameters_of_lines_and_segments(
+                origins[segment_indices],
+                directions[segment_indices],
+                segments,
+            ),
+            momapy.geometry.get_intersection_parameters_of_lines_and_elliptical_arcs(
+                origins[elliptical_arc_indices],
+                directions[elliptical_arc_indices],
+                elliptical_arcs,
+            ),
+        ]
+    ).ravel()
+    indices = numpy.repeat(
+        numpy.concatenate([segment_indices, elliptical_arc_indices]), 2
+    )
+    is_parameter = ~numpy.isnan(parameters)
+    parameters = parameters[is_parameter]
+    indices = indices[is_parameter]
+    # farthest intersection in the direction of the point if there is one,
+    # farthest intersection in the opposite direction otherwise
+    max_parameters = numpy.full(n_queries, -numpy.inf)
+    is_ok_direction = parameters >= 0
+    numpy.maximum.at(
+        max_parameters,
+        indices[is_ok_direction],
+        parameters[is_ok_direction],
+    )
+    min_parameters = numpy.full(n_queries, numpy.inf)
+    numpy.minimum.at(min_parameters, indices, parameters)
+    parameters = numpy.where(
+        max_parameters >= 0, max_parameters, min_parameters
+    )
+    with numpy.errstate(invalid="ignore"):
+        border_points = origins + parameters[:, numpy.newaxis] * directions
+    borders = []
+    for i, (layout_element, point) in enumerate(zip(layout_elements, points)):
+        if i in fallback_indices or numpy.isinf(parameters[i]):
+            if self_border:
+                border = layout_element.self_border(point)
+            else:
+                border = layout_element.border(point)
+        else:
+            border = momapy.geometry.Point(
+                float(border_points[i, 0]), float(border_points[i, 1])
+            )
+        borders.append(border)
+    return borders
+
+
 @dataclass(frozen=True, kw_only=True)
 class ArcLayout(GroupLayout):
     segments: tuple[
@@ -757,19 +1116,47 @@ class PhantomLayout(LayoutElement):
     def translated(self):
         return copy.deepcopy(self)
 
+    # only called for attributes not found on the phantom itself; special
+    # attributes are not delegated, and neither is anything while unpickling,
+    # before layout_element is set, so that phantoms can be pickled and copied
     def __getattr__(self, name):
-        if hasattr(self, name):
-            return getattr(self, name)
-        else:
-            if self.layout_element is not None:
-                return getattr(self.layout_element, name)
-            else:
-                raise AttributeError
+        layout_element = self.__dict__.get("layout_element")
+        if name.startswith("__") or layout_element is None:
+            raise AttributeError(name)
+        return getattr(layout_element, name)
+
+
+class ModelLayoutMapping(
+    frozendict
+):  # frozendict[ModelElement, frozenset[LayoutElement]]
+    def __missing__(self, key):
+        return frozenset()
 
 
 class LayoutModelMapping(
     frozendict
 ):  # frozendict[LayoutElement, tuple[ModelElement, None | ModelElement]]
+    @property
+    def model_layout_mapping(self) -> ModelLayoutMapping:
+        model_layout_mapping = self.__dict__.get("_model_layout_mapping")
+        if model_layout_mapping is None:
+            layout_elements_mapping = collections.defaultdict(set)
+            for layout_element, mapping in self.items():
+                layout_elements_mapping[mapping[0]].add(layout_element)
+            model_layout_mapping = ModelLayoutMapping(
+                [
+                    (model_element, frozenset(layout_elements))
+                    for model_element, layout_elements in layout_elements_mapping.items()
+                ]
+            )
+            object.__setattr__(
+                self, "_model_layout_mapping", model_layout_mapping
+            )
+        return model_layout_mapping
+
+    def get_layout_elements(self, model_element):
+        return self.model_layout_mapping[model_element]
+
     def is_submapping(self, other):
         for layout_element in self:
             mapping = self[layout_element]
@@ -785,6 +1172,10 @@ class Map(MapElement):
     layout: MapLayout
     layout_model_mapping: LayoutModelMapping
 
+    @property
+    def model_layout_mapping(self):
+        return self.layout_model_mapping.model_layout_mapping
+
     def is_submap(self, other):
         return (
             self.model.is_submodel(other.model)
@@ -795,6 +1186,26 @@ class Map(MapElement):
         )
 
 
+# whether the elements of a previously built collection are the elements just
+# built, in which case the collection is reused (see momapy.builder.Builder)
+def _has_same_elems(collection, elems, ordered=True):
+    if len(collection) != len(elems):
+        return False
+    if ordered:
+        return all(
+            [elem is other_elem for elem, other_elem in zip(collection, elems)]
+        )
+    return collections.Counter(
+        [_get_elem_id(elem) for elem in collection]
+    ) == collections.Counter([_get_elem_id(elem) for elem in elems])
+
+
+def _get_elem_id(elem):
+    if isinstance(elem, tuple):  # an item of a mapping
+        return tuple([id(sub_elem) for sub_elem in elem])
+    return id(elem)
+
+
 class ListBuilder(list, momapy.builder.Builder):
     _cls_to_build = list
 
@@ -850,12 +1261,15 @@ class TupleBuilder(list, momapy.builder.Builder):
                 return obj
         else:
             builder_object_mapping = {}
-        obj = self._cls_to_build(
-            [
-                momapy.builder.object_from_builder(elem, builder_object_mapping)
-                for elem in self
-            ]
-        )
+        elems = [
+            momapy.builder.object_from_builder(elem, builder_object_mapping)
+            for elem in self
+        ]
+        previous_obj = self.__dict__.get("_object")
+        if previous_obj is not None and _has_same_elems(previous_obj, elems):
+            return previous_obj
+        obj = self._cls_to_build(elems)
+        self._object = obj
         return obj
 
     @classmethod
@@ -876,6 +1290,7 @@ class TupleBuilder(list, momapy.builder.Builder):
                 for elem in obj
             ]
         )
+        builder._object = obj
         return builder
 
 
@@ -934,12 +1349,17 @@ class FrozensetBuilder(set, momapy.builder.Builder):
                 return obj
         else:
             builder_object_mapping = {}
-        obj = self._cls_to_build(
-            [
-                momapy.builder.object_from_builder(elem, builder_object_mapping)
-                for elem in self
-            ]
-        )
+        elems = [
+            momapy.builder.object_from_builder(elem, builder_object_mapping)
+            for elem in self
+        ]
+        previous_obj = self.__dict__.get("_object")
+        if previous_obj is not None and _has_same_elems(
+            previous_obj, elems, ordered=False
+        ):
+            return previous_obj
+        obj = self._cls_to_build(elems)
+        self._object = obj
         return obj
 
     @classmethod
@@ -960,6 +1380,7 @@ class FrozensetBuilder(set, momapy.builder.Builder):
                 for elem in obj
             ]
         )
+        builder._object = obj
         return builder
 
 
@@ -1032,19 +1453,20 @@ class FrozendictBuilder(dict, momapy.builder.Builder):
                 return obj
         else:
             builder_object_mapping = {}
-        obj = self._cls_to_build(
-            [
-                (
-                    momapy.builder.object_from_builder(
-                        key, builder_object_mapping
-                    ),
-                    momapy.builder.object_from_builder(
-                        val, builder_object_mapping
-                    ),
-                )
-                for key, val in self.items()
-            ]
-        )
+        items = [
+            (
+                momapy.builder.object_from_builder(key, builder_object_mapping),
+                momapy.builder.object_from_builder(val, builder_object_mapping),
+            )
+            for key, val in self.items()
+        ]
+        previous_obj = self.__dict__.get("_object")
+        if previous_obj is not None and _has_same_elems(
+            previous_obj.items(), items, ordered=False
+        ):
+            return previous_obj
+        obj = self._cls_to_build(items)
+        self._object = obj
         return obj
 
     @classmethod
@@ -1072,6 +1494,7 @@ class FrozendictBuilder(dict, momapy.builder.Builder):
                 for key, val in obj.items()
             ]
         )
+        builder._object = obj
         return builder
 
 
@@ -1134,9 +1557,86 @@ MapLayoutBuilder = momapy.builder.get_or_make_builder_cls(
 )
 
 
+class _ModelLayoutMappingIndex(
+    dict
+):  # dict[ModelElementBuilder, set[LayoutElementBuilder]], kept in sync by LayoutModelMappingBuilder
+    def __missing__(self, key):
+        return frozenset()
+
+
 class LayoutModelMappingBuilder(
     FrozendictBuilder
 ):  # dict[LayoutElementBuilder, tuple[ModelElementBuilder, None | ModelElementBuilder]]
+    _cls_to_build = LayoutModelMapping
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._model_layout_mapping = _ModelLayoutMappingIndex()
+        for layout_element, mapping in self.items():
+            self._add_to_model_layout_mapping(layout_element, mapping)
+
+    def _add_to_model_layout_mapping(self, layout_element, mapping):
+        model_layout_mapping = self._model_layout_mapping
+        model_element = mapping[0]
+        layout_elements = model_layout_mapping.get(model_element)
+        if layout_elements is None:
+            layout_elements = set()
+            model_layout_mapping[model_element] = layout_elements
+        layout_elements.add(layout_element)
+
+    def _remove_from_model_layout_mapping(self, layout_element, mapping):
+        model_layout_mapping = self._model_layout_mapping
+        model_element = mapping[0]
+        layout_elements = model_layout_mapping.get(model_element)
+        if layout_elements is not None:
+            layout_elements.discard(layout_element)
+            if not layout_elements:
+                del model_layout_mapping[model_element]
+
+    @property
+    def model_layout_mapping(self) -> _ModelLayoutMappingIndex:
+        return self._model_layout_mapping
+
+    def get_layout_elements(self, model_element):
+        return self.model_layout_mapping[model_element]
+
+    def __setitem__(self, layout_element, mapping):
+        old_mapping = self.get(layout_element)
+        if old_mapping is not None:
+            self._remove_from_model_layout_mapping(layout_element, old_mapping)
+        super().__setitem__(layout_element, mapping)
+        self._add_to_model_layout_mapping(layout_element, mapping)
+
+    def __delitem__(self, layout_element):
+        mapping = self[layout_element]
+        super().__delitem__(layout_element)
+        self._remove_from_model_layout_mapping(layout_element, mapping)
+
+    def pop(self, layout_element, *args):
+        if layout_element in self:
+            mapping = super().pop(layout_element)
+            self._remove_from_model_layout_mapping(layout_element, mapping)
+            return mapping
+        return super().pop(layout_element, *args)
+
+    def popitem(self):
+        layout_element, mapping = super().popitem()
+        self._remove_from_model_layout_mapping(layout_element, mapping)
+        return layout_element, mapping
+
+    def setdefault(self, layout_element, mapping=None):
+        if layout_element not in self:
+            self[layout_element] = mapping
+        return self[layout_element]
+
+    def update(self, *args, **kwargs):
+        for layout_element, mapping in dict(*args, **kwargs).items():
+            self[layout_element] = mapping
+
+    def clear(self):
+        super().clear()
+        self._model_layout_mapping.clear()
+
     def is_submapping(self, other):
         for layout_element in self:
             mapping = self[layout_element]
@@ -1146,6 +1646,9 @@ class LayoutModelMappingBuilder(
         return True
 
 
+momapy.builder.register_builder(LayoutModelMappingBuilder)
+
+
 @abstractmethod
 def _map_builder_new_model(self, *args, **kwargs) -> ModelBuilder:
     pass
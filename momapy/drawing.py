@@ -6,14 +6,13 @@ import math
 import copy
 from enum import Enum
 
-import numpy
-
-import shapely.geometry
-import shapely.affinity
-import shapely.ops
-
 import momapy.geometry
 import momapy.coloring
+import momapy.builder
+import momapy.utils
+
+numpy = momapy.utils.lazy_import("numpy")
+shapely = momapy.utils.lazy_import("shapely")
 
 
 class NoneValueType(object):
@@ -23,9 +22,14 @@ class NoneValueType(object):
     def __deepcopy__(self, memo):
         return self
 
+    def __reduce__(self):  # unpickled as the NoneValue singleton
+        return "NoneValue"
+
 
 NoneValue = NoneValueType()
 
+momapy.builder.register_leaf_type(NoneValueType)
+
 
 @dataclass(frozen=True)
 class FilterEffect(ABC):
@@ -171,6 +175,12 @@ class DrawingElement(ABC):
     def to_shapely(self, to_polygons=False):
         pass
 
+    # the coordinates of the element are translated, in the coordinate system
+    # of the element: its transform, if any, is kept as is
+    @abstractmethod
+    def translated(self, tx, ty):
+        pass
+
     def bbox(self):
         bounds = self.to_shapely().bounds
         return momapy.geometry.Bbox(
@@ -255,6 +265,9 @@ class MoveTo(PathAction):
             momapy.geometry.transform_point(self.point, transformation)
         )
 
+    def translated(self, tx, ty):
+        return MoveTo(self.point + (tx, ty))
+
 
 @dataclass(frozen=True)
 class LineTo(PathAction):
@@ -273,6 +286,9 @@ class LineTo(PathAction):
             momapy.geometry.transform_point(self.point, transformation)
         )
 
+    def translated(self, tx, ty):
+        return LineTo(self.point + (tx, ty))
+
     def to_geometry(self, current_point):
         return momapy.geometry.Segment(current_point, self.point)
 
@@ -333,6 +349,9 @@ class EllipticalArc(PathAction):
             self.sweep_flag,
         )
 
+    def translated(self, tx, ty):
+        return replace(self, point=self.point + (tx, ty))
+
     def to_geometry(self, current_point):
         return momapy.geometry.EllipticalArc(
             current_point,
@@ -370,6 +389,13 @@ class CurveTo(PathAction):
             momapy.geometry.transform_point(self.control_point2),
         )
 
+    def translated(self, tx, ty):
+        return CurveTo(
+            self.point + (tx, ty),
+            self.control_point1 + (tx, ty),
+            self.control_point2 + (tx, ty),
+        )
+
     def to_geometry(self, current_point):
         return momapy.geometry.BezierCurve(
             current_point,
@@ -401,6 +427,11 @@ class QuadraticCurveTo(PathAction):
             momapy.geometry.transform_point(self.control_point),
         )
 
+    def translated(self, tx, ty):
+        return QuadraticCurveTo(
+            self.point + (tx, ty), self.control_point + (tx, ty)
+        )
+
     def to_curve_to(self, current_point):
         p1 = current_point
         p2 = self.point
@@ -425,6 +456,9 @@ class Close(PathAction):
     def transformed(self, transformation, current_point):
         return Close()
 
+    def translated(self, tx, ty):
+        return self
+
 
 @dataclass
 class PathActionList(object):
@@ -467,6 +501,29 @@ class Path(DrawingElement):
                 current_point = None
         return replace(self, actions=tuple(actions))
 
+    # a translated path keeps the path it was first translated from and the
+    # translation, so that renderers can make their own path once and draw it
+    # with a translation for all the translated copies
+    def translated(self, tx, ty):
+        actions = tuple(
+            [path_action.translated(tx, ty) for path_action in self.actions]
+        )
+        path = replace(self, actions=actions)
+        translation = self.get_translation()
+        if translation is None:
+            translation = (self, tx, ty)
+        else:
+            translation = (
+                translation[0],
+                translation[1] + tx,
+                translation[2] + ty,
+            )
+        object.__setattr__(path, "_translation", translation)
+        return path
+
+    def get_translation(self):
+        return self.__dict__.get("_translation")
+
     def to_shapely(self, to_polygons=False):
         current_point = momapy.geometry.Point(
             0, 0
@@ -536,6 +593,9 @@ class Text(DrawingElement):
     def transformed(self):
         return copy.deepcopy(self)
 
+    def translated(self, tx, ty):
+        return replace(self, position=self.position + (tx, ty))
+
     def to_shapely(self, to_polygons=False):
         return shapely.geometry.GeometryCollection([self.position.to_shapely()])
 
@@ -560,6 +620,12 @@ class Group(DrawingElement):
             elements.append(layout_element.transformed(transformation))
         return replace(self, elements=tuple(elements))
 
+    def translated(self, tx, ty):
+        elements = tuple(
+            [element.translated(tx, ty) for element in self.elements]
+        )
+        return replace(self, elements=elements)
+
     def to_shapely(self, to_polygons=False):
         geom_collection = []
         for element in self.elements:
@@ -601,6 +667,9 @@ class Ellipse(DrawingElement):
         path = self.to_path()
         return path.transformed(transformation)
 
+    def translated(self, tx, ty):
+        return replace(self, point=self.point + (tx, ty))
+
     def to_shapely(self, to_polygons=False):
         point = self.point.to_shapely()
         circle = point.buffer(1)
@@ -673,6 +742,9 @@ class Rectangle(DrawingElement):
         path = self.to_path()
         return path.transformed(transformation)
 
+    def translated(self, tx, ty):
+        return replace(self, point=self.point + (tx, ty))
+
     def to_shapely(self, to_polygons=False):
         return self.to_path().to_shapely(to_polygons=to_polygons)
 
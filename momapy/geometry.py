@@ -3,15 +3,15 @@ from typing import Optional, Any, Callable, Union
 from abc import ABC, abstractmethod
 
 import math
-import numpy
 import decimal
 import copy
 
-import shapely
-
 import momapy.builder
+import momapy.utils
 
-import bezier.curve
+numpy = momapy.utils.lazy_import("numpy")
+shapely = momapy.utils.lazy_import("shapely")
+bezier = momapy.utils.lazy_import("bezier")
 
 ROUNDING = 2
 decimal.getcontext().prec = ROUNDING
@@ -79,7 +79,7 @@ class Point(GeometryObject):
         return Bbox(copy.deepcopy(self), 0, 0)
 
     @classmethod
-    def from_shapely(cls, point: shapely.Point):
+    def from_shapely(cls, point: "shapely.Point"):
         return cls(point.x, point.y)
 
     @classmethod
@@ -183,7 +183,7 @@ class Segment(GeometryObject):
         return Bbox.from_bounds(self.to_shapely().bounds)
 
     @classmethod
-    def from_shapely(cls, line_string: shapely.LineString):
+    def from_shapely(cls, line_string: "shapely.LineString"):
         shapely_points = line_string.boundary.geoms
         return cls(
             Point.from_shapely(shapely_points[0]),
@@ -514,7 +514,7 @@ class Transformation(ABC):
 
 @dataclass(frozen=True)
 class MatrixTransformation(Transformation):
-    m: numpy.array
+    m: "numpy.array"
 
     def to_matrix(self):
         return self.m
@@ -618,7 +618,7 @@ def get_intersection_of_object_and_line(
         GeometryObject,
         "momapy.core.LayoutElement",
         "momapy.drawing.DrawingElement",
-        shapely.Geometry,
+        "shapely.Geometry",
     ],
     line: Line,
 ):
@@ -696,6 +696,111 @@ def get_intersection_of_object_and_line(
     return intersection
 
 
+# parameters t such that line.p1 + t * (line.p2 - line.p1) is an intersection
+def get_intersection_parameters_of_line_and_segment(line, segment):
+    dx = line.p2.x - line.p1.x
+    dy = line.p2.y - line.p1.y
+    ex = segment.p2.x - segment.p1.x
+    ey = segment.p2.y - segment.p1.y
+    fx = segment.p1.x - line.p1.x
+    fy = segment.p1.y - line.p1.y
+    d = dx * ey - dy * ex
+    if d == 0:
+        if fx * dy - fy * dx != 0:  # parallel
+            return []
+        n = dx * dx + dy * dy  # coincident: both ends are intersections
+        return [
+            (fx * dx + fy * dy) / n,
+            ((fx + ex) * dx + (fy + ey) * dy) / n,
+        ]
+    s = (fx * dy - fy * dx) / d
+    if s < 0 or s > 1:
+        return []
+    return [(fx * ey - fy * ex) / d]
+
+
+def get_intersection_parameters_of_line_and_ellipse(line, center, rx, ry):
+    if rx <= 0 or ry <= 0:
+        return []
+    dx = (line.p2.x - line.p1.x) / rx
+    dy = (line.p2.y - line.p1.y) / ry
+    fx = (line.p1.x - center.x) / rx
+    fy = (line.p1.y - center.y) / ry
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - 1
+    discriminant = b * b - 4 * a * c
+    if a == 0 or discriminant < 0:
+        return []
+    sqrt_discriminant = math.sqrt(discriminant)
+    return [
+        (-b - sqrt_discriminant) / (2 * a),
+        (-b + sqrt_discriminant) / (2 * a),
+    ]
+
+
+# vectorized versions: the line of row i (given by its origin and direction)
+# is intersected with the segment or elliptical arc of row i; rows of the
+# returned (n, 2) array hold up to two parameters, nan where there are none
+def get_intersection_parameters_of_lines_and_segments(
+    origins, directions, segments
+):
+    dx = directions[:, 0]
+    dy = directions[:, 1]
+    ex = segments[:, 2] - segments[:, 0]
+    ey = segments[:, 3] - segments[:, 1]
+    fx = segments[:, 0] - origins[:, 0]
+    fy = segments[:, 1] - origins[:, 1]
+    d = dx * ey - dy * ex
+    cross = fx * dy - fy * dx
+    parameters = numpy.full((len(segments), 2), numpy.nan)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        s = cross / d
+        crossing = (d != 0) & (s >= 0) & (s <= 1)
+        parameters[crossing, 0] = ((fx * ey - fy * ex) / d)[crossing]
+        coincident = (d == 0) & (cross == 0)
+        n = dx * dx + dy * dy
+        parameters[coincident, 0] = ((fx * dx + fy * dy) / n)[coincident]
+        parameters[coincident, 1] = (((fx + ex) * dx + (fy + ey) * dy) / n)[
+            coincident
+        ]
+    return parameters
+
+
+def get_intersection_parameters_of_lines_and_elliptical_arcs(
+    origins, directions, elliptical_arcs
+):  # elliptical arcs as rows (cx, cy, rx, ry, sx, sy)
+    cx, cy, rx, ry, sx, sy = elliptical_arcs.T
+    parameters = numpy.full((len(elliptical_arcs), 2), numpy.nan)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        dx = directions[:, 0] / rx
+        dy = directions[:, 1] / ry
+        fx = (origins[:, 0] - cx) / rx
+        fy = (origins[:, 1] - cy) / ry
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - 1
+        discriminant = b * b - 4 * a * c
+        valid = (rx > 0) & (ry > 0) & (a != 0) & (discriminant >= 0)
+        sqrt_discriminant = numpy.sqrt(numpy.where(valid, discriminant, 0))
+        for i, sign in enumerate([-1, 1]):
+            t = (-b + sign * sqrt_discriminant) / (2 * a)
+            on_arc = (
+                valid
+                & ((origins[:, 0] + t * directions[:, 0] - cx) * sx >= 0)
+                & ((origins[:, 1] + t * directions[:, 1] - cy) * sy >= 0)
+            )
+            parameters[on_arc, i] = t[on_arc]
+    return parameters
+
+
+def get_point_of_line_at_parameter(line, parameter):
+    return Point(
+        line.p1.x + parameter * (line.p2.x - line.p1.x),
+        line.p1.y + parameter * (line.p2.y - line.p1.y),
+    )
+
+
 # angle in radians
 def get_angle_of_line(line):
     x1 = line.p1.x
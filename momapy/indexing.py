@@ -0,0 +1,107 @@
+import dataclasses
+import math
+import typing
+
+import momapy.geometry
+import momapy.utils
+
+numpy = momapy.utils.lazy_import("numpy")
+shapely = momapy.utils.lazy_import("shapely")
+
+
+def _get_bounds_from_bbox(bbox):
+    north_west = bbox.north_west()
+    south_east = bbox.south_east()
+    return (north_west.x, north_west.y, south_east.x, south_east.y)
+
+
+@dataclasses.dataclass(frozen=True)
+class SpatialIndex(object):
+    layout_elements: tuple = dataclasses.field(default_factory=tuple)
+    bounds: "numpy.ndarray" = dataclasses.field(
+        default_factory=lambda: numpy.empty((0, 4)), compare=False
+    )
+    tree: typing.Optional["shapely.STRtree"] = dataclasses.field(
+        default=None, compare=False
+    )
+
+    def __len__(self):
+        return len(self.layout_elements)
+
+    @classmethod
+    def from_layout_elements(cls, layout_elements):
+        indexed_layout_elements = []
+        bounds = []
+        for layout_element in layout_elements:
+            element_bounds = _get_bounds_from_bbox(layout_element.bbox())
+            if not any([math.isnan(value) for value in element_bounds]):
+                indexed_layout_elements.append(layout_element)
+                bounds.append(element_bounds)
+        bounds = numpy.array(bounds, dtype=float).reshape((-1, 4))
+        boxes = shapely.box(
+            bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
+        )
+        tree = shapely.STRtree(boxes)
+        return cls(
+            layout_elements=tuple(indexed_layout_elements),
+            bounds=bounds,
+            tree=tree,
+        )
+
+    @classmethod
+    def from_layout_element(cls, layout_element, descendants=True):
+        if descendants:
+            layout_elements = layout_element.descendants()
+        else:
+            layout_elements = layout_element.children()
+        return cls.from_layout_elements(layout_elements)
+
+    def _get_layout_elements_from_indices(self, indices):
+        return [self.layout_elements[index] for index in sorted(indices)]
+
+    def query_bbox(self, bbox, contained=False):
+        box = shapely.box(*_get_bounds_from_bbox(bbox))
+        if contained:
+            predicate = "contains"
+        else:
+            predicate = "intersects"
+        indices = self.tree.query(box, predicate=predicate)
+        return self._get_layout_elements_from_indices(indices)
+
+    def query_point(self, point, tolerance=0.0, exact=False):
+        shapely_point = shapely.Point(point.x, point.y)
+        if tolerance > 0:
+            indices = self.tree.query(
+                shapely_point, predicate="dwithin", distance=tolerance
+            )
+        else:
+            indices = self.tree.query(shapely_point, predicate="intersects")
+        layout_elements = self._get_layout_elements_from_indices(indices)
+        if exact:
+            layout_elements = [
+                layout_element
+                for layout_element in layout_elements
+                if layout_element.to_shapely(to_polygons=True).distance(
+                    shapely_point
+                )
+                <= tolerance
+            ]
+        return layout_elements
+
+    def nearest(self, point):
+        if len(self.layout_elements) == 0:
+            return None
+        index = self.tree.nearest(shapely.Point(point.x, point.y))
+        return self.layout_elements[index]
+
+    def bbox(self):
+        if len(self.layout_elements) == 0:
+            return None
+        return momapy.geometry.Bbox.from_bounds(
+            (
+                float(self.bounds[:, 0].min()),
+                float(self.bounds[:, 1].min()),
+                float(self.bounds[:, 2].max()),
+                float(self.bounds[:, 3].max()),
+            )
+        )
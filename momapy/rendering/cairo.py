@@ -10,6 +10,7 @@ import gi.repository
 import momapy.drawing
 import momapy.geometry
 import momapy.builder
+import momapy.caching
 import momapy.rendering.core
 
 
@@ -40,6 +41,7 @@ class CairoRenderer(momapy.rendering.core.Renderer):
     context: cairo.Context
     config: dict = dataclasses.field(default_factory=dict)
     _pango_font_descriptions: dict = dataclasses.field(default_factory=dict)
+    _cairo_paths: dict = dataclasses.field(default_factory=dict)
 
     @classmethod
     def from_file(cls, output_file, width, height, format_, config=None):
@@ -93,13 +95,69 @@ class CairoRenderer(momapy.rendering.core.Renderer):
             surface = self.context.get_target()
             surface.set_size(width, height)
 
-    def render_map(self, map_):
-        self.render_layout_element(map_.layout)
+    def render_map(self, map_, viewport=None):
+        if viewport is None:
+            self.render_layout_element(map_.layout)
+        else:
+            north_west = viewport.north_west()
+            self.context.save()
+            self.context.translate(-north_west.x, -north_west.y)
+            self.context.rectangle(
+                north_west.x, north_west.y, viewport.width, viewport.height
+            )
+            self.context.clip()
+            lod_policy = self.config.get("lod_policy")
+            if lod_policy is not None:
+                scale = self._get_device_scale()
+            else:
+                scale = 1.0
+            display_list = (
+                momapy.rendering.core.compile_layout_element_in_viewport(
+                    map_.layout, viewport, lod_policy, scale
+                )
+            )
+            self.render_display_list(display_list)
+            self.context.restore()
 
     def render_layout_element(self, layout_element):
-        drawing_elements = layout_element.drawing_elements()
-        for drawing_element in drawing_elements:
-            self.render_drawing_element(drawing_element)
+        lod_policy = self.config.get("lod_policy")
+        if lod_policy is not None:
+            display_list = (
+                momapy.rendering.core.compile_layout_element_with_lod(
+                    layout_element, lod_policy, self._get_device_scale()
+                )
+            )
+        else:
+            display_list = momapy.rendering.core.compile_layout_element(
+                layout_element
+            )
+        self.render_display_list(display_list)
+
+    def _get_device_scale(self):
+        matrix = self.context.get_matrix()
+        return math.sqrt(abs(matrix.xx * matrix.yy - matrix.yx * matrix.xy))
+
+    # filters are not supported, so group items are rendered as their elements
+    def render_display_list(self, display_list):
+        state = self._get_state()
+        for item in display_list:
+            self.context.save()
+            self._stroke = item.stroke
+            self._fill = item.fill
+            self._stroke_width = item.stroke_width
+            if item.transform is not None:
+                self.context.transform(cairo.Matrix(*item.transform))
+            if isinstance(item, momapy.rendering.core.DisplayGroupItem):
+                self.render_display_list(item.items)
+            else:
+                class_ = type(item.drawing_element)
+                if issubclass(class_, momapy.builder.Builder):
+                    class_ = class_._cls_to_build
+                de_func = getattr(self, self._de_class_func_mapping[class_])
+                de_func(item.drawing_element)
+            self.context.restore()
+            self._set_new_path()
+        self._set_state(state)
 
     def render_drawing_element(self, drawing_element):
         self._save()
@@ -112,12 +170,15 @@ class CairoRenderer(momapy.rendering.core.Renderer):
         de_func(drawing_element)
         self._restore()
 
-    def _save(self):
-        state = {
+    def _get_state(self):
+        return {
             "stroke": self._stroke,
             "fill": self._fill,
             "stroke_width": self._stroke_width,
         }
+
+    def _save(self):
+        state = self._get_state()
         self._states.append(state)
         self.context.save()
 
@@ -193,9 +254,35 @@ class CairoRenderer(momapy.rendering.core.Renderer):
         for drawing_element in group.elements:
             self.render_drawing_element(drawing_element)
 
-    def _render_path(self, path):
+    # the cairo path of a path that translated paths are translated from is
+    # made once, on a context of its own so that the current path is kept
+    def _get_cairo_path(self, path):
+        cached = self._cairo_paths.get(id(path))
+        if cached is not None and cached[0] is path:
+            return cached[1]
+        saved_context = self.context
+        self.context = cairo.Context(
+            cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+        )
         for path_action in path.actions:
             self._render_path_action(path_action)
+        cairo_path = self.context.copy_path()
+        self.context = saved_context
+        self._cairo_paths[id(path)] = (path, cairo_path)
+        return cairo_path
+
+    def _render_path(self, path):
+        translation = path.get_translation()
+        if translation is None or not momapy.caching.enabled:
+            for path_action in path.actions:
+                self._render_path_action(path_action)
+        else:
+            untranslated_path, tx, ty = translation
+            cairo_path = self._get_cairo_path(untranslated_path)
+            self.context.save()
+            self.context.translate(tx, ty)
+            self.context.append_path(cairo_path)
+            self.context.restore()
         self._stroke_and_fill()
 
     def _render_text(self, text):
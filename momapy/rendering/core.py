@@ -2,25 +2,54 @@ from dataclasses import dataclass, InitVar
 from copy import deepcopy
 from abc import ABC, abstractmethod
 from typing import ClassVar, Optional, Collection, Union
-import cairo
-import gi
-import skia
-
+import concurrent.futures
+import importlib
+import io
 import math
+import os
 
 import momapy.drawing
 import momapy.styling
 import momapy.positioning
 import momapy.geometry
 import momapy.builder
+import momapy.caching
+import momapy.coloring
 
 renderers = {}
 
+# modules registering the renderers, imported the first time one of their
+# renderers is requested so that their backends are only loaded when needed
+renderer_modules = {
+    "cairo": "momapy.rendering.cairo",
+    "skia": "momapy.rendering.skia",
+    "skia-tiled": "momapy.rendering.skia",
+    "svg-native": "momapy.rendering.svg_native",
+    "svg-native-compat": "momapy.rendering.svg_native",
+}
+
 
 def register_renderer(name, renderer_cls):
     renderers[name] = renderer_cls
 
 
+def get_renderer(name):
+    renderer_cls = renderers.get(name)
+    if renderer_cls is None:
+        module_name = renderer_modules.get(name)
+        if module_name is None:
+            raise ValueError(f"unknown renderer '{name}'")
+        importlib.import_module(module_name)
+        renderer_cls = renderers[name]
+    return renderer_cls
+
+
+def is_file_path(output_file):
+    return isinstance(output_file, (str, os.PathLike))
+
+
+# output_file is a file path or a binary file object; when it is None, the
+# rendering is returned as bytes, or as a numpy array for the array format
 def render_map(
     map_,
     output_file,
@@ -28,9 +57,38 @@ def render_map(
     renderer="cairo",
     style_sheet=None,
     to_top_left=False,
+    viewport=None,
+    lod_policy=None,
 ):
     maps = [map_]
-    render_maps(maps, output_file, format_, renderer, style_sheet, to_top_left)
+    return render_maps(
+        maps,
+        output_file,
+        format_,
+        renderer,
+        style_sheet,
+        to_top_left,
+        viewport=viewport,
+        lod_policy=lod_policy,
+    )
+
+
+def _get_style_sheet(style_sheet):
+    if isinstance(style_sheet, momapy.styling.StyleSheet):
+        return style_sheet
+    if not isinstance(style_sheet, Collection) or isinstance(style_sheet, str):
+        style_sheets = [style_sheet]
+    else:
+        style_sheets = style_sheet
+    style_sheets = [
+        (
+            momapy.styling.read_file(style_sheet)
+            if not isinstance(style_sheet, momapy.styling.StyleSheet)
+            else style_sheet
+        )
+        for style_sheet in style_sheets
+    ]
+    return momapy.styling.join_style_sheets(style_sheets)
 
 
 def render_maps(
@@ -41,6 +99,8 @@ def render_maps(
     style_sheet=None,
     to_top_left=False,
     multi_pages=True,
+    viewport=None,
+    lod_policy=None,
 ):
     bboxes = [map_.layout.self_bbox() for map_ in maps]
     position, width, height = momapy.positioning.fit(bboxes)
@@ -50,26 +110,14 @@ def render_maps(
         new_maps = []
         for map_ in maps:
             if isinstance(map_, momapy.core.Map):
-                new_maps.append(momapy.builder.builder_from_object(map_))
+                new_maps.append(
+                    momapy.builder.builder_from_object(map_, lazy=True)
+                )
             elif isinstance(map_, momapy.core.MapBuilder):
                 new_maps.append(deepcopy(map_))
         maps = new_maps
     if style_sheet is not None:
-        if (
-            not isinstance(style_sheet, Collection)
-            or isinstance(style_sheet, str)
-            or isinstance(style_sheet, momapy.styling.StyleSheet)
-        ):
-            style_sheets = [style_sheet]
-        else:
-            style_sheets = style_sheet
-        style_sheets = [
-            momapy.styling.read_file(style_sheet)
-            if not isinstance(style_sheet, momapy.styling.StyleSheet)
-            else style_sheet
-            for style_sheet in style_sheets
-        ]
-        style_sheet = momapy.styling.join_style_sheets(style_sheets)
+        style_sheet = _get_style_sheet(style_sheet)
         for map_ in maps:
             momapy.styling.apply_style_sheet(map_.layout, style_sheet)
     if to_top_left:
@@ -82,13 +130,85 @@ def render_maps(
             if map_.layout.transform is None:
                 map_.layout.transform = momapy.core.TupleBuilder()
             map_.layout.transform.append(translation)
-    renderer = renderers[renderer].from_file(output_file, max_x, max_y, format_)
+    # only the region of the viewport is rendered, to an output of its size
+    if viewport is not None:
+        max_x = viewport.width
+        max_y = viewport.height
+    config = {}
+    if lod_policy is not None:
+        config["lod_policy"] = lod_policy
+    if output_file is None and format_ != "array":
+        output = io.BytesIO()
+    else:
+        output = output_file
+    renderer = get_renderer(renderer).from_file(
+        output, max_x, max_y, format_, config
+    )
     renderer.begin_session()
     for i, map_ in enumerate(maps):
         if multi_pages and i > 0:
-            renderer.new_page(map_.layout.width, map_.layout.height)
-        renderer.render_map(map_)
+            if viewport is not None:
+                renderer.new_page(viewport.width, viewport.height)
+            else:
+                renderer.new_page(map_.layout.width, map_.layout.height)
+        renderer.render_map(map_, viewport=viewport)
     renderer.end_session()
+    if output_file is None:
+        if format_ == "array":
+            return renderer.config["array"]
+        return output.getvalue()
+
+
+# renders (map, output_file, format) jobs in a pool of processes or threads;
+# style sheets are read once and shared by all jobs, and maps must be picklable
+# when rendering in processes. Returns a (result, exception) pair per job: the
+# value returned by render_map, i.e. the rendering if the output file is None,
+# and the exception raised by the job, or None if it succeeded;
+# progress_callback is called with the number of jobs done, the number of jobs,
+# the job and its exception each time a job is done
+def render_map_jobs(
+    jobs,
+    renderer="cairo",
+    style_sheet=None,
+    to_top_left=False,
+    executor="process",
+    max_workers=None,
+    progress_callback=None,
+):
+    jobs = list(jobs)
+    if style_sheet is not None:
+        style_sheet = _get_style_sheet(style_sheet)
+    if executor == "process":
+        executor_cls = concurrent.futures.ProcessPoolExecutor
+    elif executor == "thread":
+        executor_cls = concurrent.futures.ThreadPoolExecutor
+    else:
+        raise ValueError(f"unknown executor '{executor}'")
+    results = [None for _ in jobs]
+    errors = [None for _ in jobs]
+    with executor_cls(max_workers=max_workers) as pool:
+        futures = {}
+        for i, (map_, output_file, format_) in enumerate(jobs):
+            future = pool.submit(
+                render_map,
+                map_,
+                output_file,
+                format_,
+                renderer,
+                style_sheet,
+                to_top_left,
+            )
+            futures[future] = i
+        for n_done, future in enumerate(
+            concurrent.futures.as_completed(futures), 1
+        ):
+            i = futures[future]
+            errors[i] = future.exception()
+            if errors[i] is None:
+                results[i] = future.result()
+            if progress_callback is not None:
+                progress_callback(n_done, len(jobs), jobs[i], errors[i])
+    return list(zip(results, errors))
 
 
 @dataclass
@@ -113,7 +233,7 @@ class Renderer(ABC):
         pass
 
     @abstractmethod
-    def render_map(self, map_):
+    def render_map(self, map_, viewport=None):
         pass
 
     @abstractmethod
@@ -123,3 +243,400 @@ class Renderer(ABC):
     @abstractmethod
     def render_drawing_element(self, drawing_element):
         pass
+
+
+# display lists are flat sequences of items, one per drawing element other than
+# groups, holding the stroke and fill state it inherits and the transformation
+# composed from those of its ancestors, as an affine (xx, yx, xy, yy, x0, y0)
+# tuple, or None for the identity. Groups with a filter are kept as group items,
+# holding the display list of their elements relative to them
+@dataclass(frozen=True)
+class DisplayItem(object):
+    drawing_element: momapy.drawing.DrawingElement
+    stroke: Optional[momapy.coloring.Color] = None
+    fill: Optional[momapy.coloring.Color] = None
+    stroke_width: Optional[float] = None
+    stroke_dasharray: Optional[tuple[float]] = None
+    stroke_dashoffset: Optional[float] = None
+    transform: Optional[tuple[float]] = None
+    filter: Optional[momapy.drawing.Filter] = None
+
+
+@dataclass(frozen=True)
+class DisplayGroupItem(DisplayItem):
+    items: tuple[DisplayItem] = ()
+
+
+def _get_affine_transform(transformation):
+    m = transformation.to_matrix()
+    return (
+        float(m[0][0]),
+        float(m[1][0]),
+        float(m[0][1]),
+        float(m[1][1]),
+        float(m[0][2]),
+        float(m[1][2]),
+    )
+
+
+def compose_affine_transforms(transform1, transform2):
+    if transform1 is None:
+        return transform2
+    if transform2 is None:
+        return transform1
+    a1, b1, c1, d1, e1, f1 = transform1
+    a2, b2, c2, d2, e2, f2 = transform2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def get_drawing_state(element, state):
+    stroke, fill, stroke_width, stroke_dasharray, stroke_dashoffset = state
+    if element.stroke is momapy.drawing.NoneValue:
+        stroke = None
+    elif element.stroke is not None:
+        stroke = element.stroke
+    if element.fill is momapy.drawing.NoneValue:
+        fill = None
+    elif element.fill is not None:
+        fill = element.fill
+    if element.stroke_width is not None:
+        stroke_width = element.stroke_width
+    if element.stroke_dasharray is momapy.drawing.NoneValue:
+        stroke_dasharray = None
+    elif element.stroke_dasharray is not None:
+        stroke_dasharray = element.stroke_dasharray
+    if element.stroke_dashoffset is momapy.drawing.NoneValue:
+        stroke_dashoffset = None
+    elif element.stroke_dashoffset is not None:
+        stroke_dashoffset = element.stroke_dashoffset
+    return (stroke, fill, stroke_width, stroke_dasharray, stroke_dashoffset)
+
+
+def get_drawing_transform(element, transform):
+    if (
+        element.transform is not None
+        and element.transform is not momapy.drawing.NoneValue
+    ):
+        for transformation in element.transform:
+            transform = compose_affine_transforms(
+                transform, _get_affine_transform(transformation)
+            )
+        if transform == (1.0, 0.0, 0.0, 1.0, 0.0, 0.0):
+            transform = None
+    return transform
+
+
+def _compile_drawing_element(drawing_element, state, transform, items):
+    state = get_drawing_state(drawing_element, state)
+    transform = get_drawing_transform(drawing_element, transform)
+    filter_ = drawing_element.filter
+    if filter_ is momapy.drawing.NoneValue:
+        filter_ = None
+    if momapy.builder.isinstance_or_builder(
+        drawing_element, momapy.drawing.Group
+    ):
+        if filter_ is not None:
+            group_items = []
+            for element in drawing_element.elements:
+                _compile_drawing_element(element, state, None, group_items)
+            items.append(
+                DisplayGroupItem(
+                    drawing_element,
+                    *state,
+                    transform=transform,
+                    filter=filter_,
+                    items=tuple(group_items),
+                )
+            )
+        else:
+            for element in drawing_element.elements:
+                _compile_drawing_element(element, state, transform, items)
+    else:
+        items.append(
+            DisplayItem(
+                drawing_element, *state, transform=transform, filter=filter_
+            )
+        )
+
+
+def get_default_drawing_state():
+    return (
+        None,
+        Renderer.default_fill,
+        Renderer.default_stroke_width,
+        None,
+        Renderer.default_stroke_dashoffset,
+    )
+
+
+def compile_drawing_elements(drawing_elements, state=None, transform=None):
+    if state is None:
+        state = get_default_drawing_state()
+    items = []
+    for drawing_element in drawing_elements:
+        _compile_drawing_element(drawing_element, state, transform, items)
+    return tuple(items)
+
+
+# compiled once per frozen layout element, and every time for builders
+@momapy.caching.cached_method
+def compile_layout_element(layout_element):
+    return compile_drawing_elements(layout_element.drawing_elements())
+
+
+def invert_affine_transform(transform):
+    xx, yx, xy, yy, x0, y0 = transform
+    det = xx * yy - yx * xy
+    return (
+        yy / det,
+        -yx / det,
+        -xy / det,
+        xx / det,
+        (xy * y0 - yy * x0) / det,
+        (yx * x0 - xx * y0) / det,
+    )
+
+
+def transform_bbox(bbox, transform):
+    if transform is None:
+        return bbox
+    xx, yx, xy, yy, x0, y0 = transform
+    north_west = bbox.north_west()
+    south_east = bbox.south_east()
+    xs = []
+    ys = []
+    for x, y in [
+        (north_west.x, north_west.y),
+        (south_east.x, north_west.y),
+        (south_east.x, south_east.y),
+        (north_west.x, south_east.y),
+    ]:
+        xs.append(xx * x + xy * y + x0)
+        ys.append(yx * x + yy * y + y0)
+    return momapy.geometry.Bbox.from_bounds(
+        (min(xs), min(ys), max(xs), max(ys))
+    )
+
+
+# a layout element can only be culled child by child when it is a group without
+# a filter, since a filter applies to the group as a whole
+def is_splittable(layout_element):
+    return momapy.builder.isinstance_or_builder(
+        layout_element, momapy.core.GroupLayout
+    ) and (
+        layout_element.filter is None
+        or layout_element.filter is momapy.drawing.NoneValue
+    )
+
+
+# returns the children of the layout element whose bbox intersects the
+# viewport, given in the coordinates of the layout element's parent; the spatial
+# index of the children is cached on frozen layout elements
+def get_children_in_viewport(layout_element, viewport):
+    transform = get_drawing_transform(layout_element, None)
+    if transform is not None:
+        viewport = transform_bbox(viewport, invert_affine_transform(transform))
+    spatial_index = layout_element.spatial_index(descendants=False)
+    children = spatial_index.query_bbox(viewport)
+    return children
+
+
+# compiles the layout element's own drawing elements and those of the given
+# children only, with the state and transformation of the layout element
+def compile_layout_element_children(
+    layout_element, children, state=None, transform=None
+):
+    if state is None:
+        state = get_default_drawing_state()
+    state = get_drawing_state(layout_element, state)
+    transform = get_drawing_transform(layout_element, transform)
+    items = list(
+        compile_drawing_elements(
+            layout_element.self_drawing_elements(), state, transform
+        )
+    )
+    for child in children:
+        items += compile_drawing_elements(
+            child.drawing_elements(), state, transform
+        )
+    return tuple(items)
+
+
+def compile_layout_element_in_viewport(
+    layout_element, viewport, lod_policy=None, scale=1.0
+):
+    if not is_splittable(layout_element):
+        children = None
+    else:
+        children = get_children_in_viewport(layout_element, viewport)
+    if lod_policy is not None:
+        return compile_layout_element_with_lod(
+            layout_element, lod_policy, scale, children=children
+        )
+    if children is None:
+        return compile_layout_element(layout_element)
+    return compile_layout_element_children(layout_element, children)
+
+
+# level of detail policy for zoomed-out renderings; sizes are in device units,
+# i.e. in map units multiplied by the effective scale of the rendering. Texts
+# smaller than min_text_size are skipped, nodes smaller than min_shape_size are
+# drawn as rectangles, arrowheads shorter than min_arrowhead_size are drawn as
+# squares, and filters with a drop shadow effect are dropped if drop_shadows
+@dataclass(frozen=True)
+class LODPolicy(object):
+    min_text_size: float = 6.0
+    min_shape_size: float = 12.0
+    min_arrowhead_size: float = 6.0
+    drop_shadows: bool = True
+
+
+def get_affine_transform_scale(transform):
+    if transform is None:
+        return 1.0
+    xx, yx, xy, yy, x0, y0 = transform
+    return math.sqrt(abs(xx * yy - yx * xy))
+
+
+def _has_drop_shadow_effect(filter_):
+    for effect in filter_.effects:
+        if momapy.builder.isinstance_or_builder(
+            effect, momapy.drawing.DropShadowEffect
+        ):
+            return True
+    return False
+
+
+def _make_lod_arrowhead_drawing_element(arc_layout):
+    length = arc_layout.arrowhead_length()
+    base = arc_layout.arrowhead_base()
+    line = momapy.geometry.Line(base, arc_layout.arrowhead_tip())
+    angle = momapy.geometry.get_angle_of_line(line)
+    return momapy.drawing.Rectangle(
+        point=base - (0, length / 2),
+        width=length,
+        height=length,
+        rx=0,
+        ry=0,
+        stroke=arc_layout.arrowhead_stroke,
+        stroke_width=arc_layout.arrowhead_stroke_width,
+        fill=arc_layout.arrowhead_fill,
+        transform=(momapy.geometry.Rotation(angle, base),),
+    )
+
+
+# small nodes are drawn as a rectangle with the stroke and fill of the first
+# element of their border, so that they keep their colors
+def _compile_lod_self_drawing_elements(
+    layout_element, lod_policy, scale, state, transform
+):
+    if momapy.builder.isinstance_or_builder(
+        layout_element, momapy.core.NodeLayout
+    ):
+        size = max(layout_element.width, layout_element.height)
+        if size * scale < lod_policy.min_shape_size:
+            items = compile_drawing_elements(
+                layout_element.self_drawing_elements(), state, transform
+            )
+            if not items:
+                return items
+            item = items[0]
+            while isinstance(item, DisplayGroupItem) and item.items:
+                item = item.items[0]
+            rectangle = momapy.drawing.Rectangle(
+                point=layout_element.position
+                - (layout_element.width / 2, layout_element.height / 2),
+                width=layout_element.width,
+                height=layout_element.height,
+                rx=0,
+                ry=0,
+            )
+            return (
+                DisplayItem(
+                    rectangle,
+                    item.stroke,
+                    item.fill,
+                    item.stroke_width,
+                    item.stroke_dasharray,
+                    item.stroke_dashoffset,
+                    transform=transform,
+                ),
+            )
+    elif momapy.builder.isinstance_or_builder(
+        layout_element, momapy.core.ArcLayout
+    ):
+        length = layout_element.arrowhead_length()
+        if 0 < length * scale < lod_policy.min_arrowhead_size:
+            path = layout_element.self_drawing_elements()[0]
+            arrowhead = _make_lod_arrowhead_drawing_element(layout_element)
+            return compile_drawing_elements([path, arrowhead], state, transform)
+    return compile_drawing_elements(
+        layout_element.self_drawing_elements(), state, transform
+    )
+
+
+def _compile_layout_element_with_lod(
+    layout_element, lod_policy, scale, state, transform, items, children=None
+):
+    effective_scale = scale * get_affine_transform_scale(transform)
+    if momapy.builder.isinstance_or_builder(
+        layout_element, momapy.core.TextLayout
+    ):
+        if (
+            layout_element.font_size * effective_scale
+            < lod_policy.min_text_size
+        ):
+            return
+    if not momapy.builder.isinstance_or_builder(
+        layout_element, momapy.core.GroupLayout
+    ):
+        items += compile_drawing_elements(
+            layout_element.drawing_elements(), state, transform
+        )
+        return
+    filter_ = layout_element.filter
+    if filter_ is not None and filter_ is not momapy.drawing.NoneValue:
+        if not lod_policy.drop_shadows or not _has_drop_shadow_effect(filter_):
+            items += compile_drawing_elements(
+                layout_element.drawing_elements(), state, transform
+            )
+            return
+    state = get_drawing_state(layout_element, state)
+    transform = get_drawing_transform(layout_element, transform)
+    effective_scale = scale * get_affine_transform_scale(transform)
+    items += _compile_lod_self_drawing_elements(
+        layout_element, lod_policy, effective_scale, state, transform
+    )
+    if children is None:
+        children = layout_element.children()
+    for child in children:
+        if child is not None:
+            _compile_layout_element_with_lod(
+                child, lod_policy, scale, state, transform, items
+            )
+
+
+# scale is the scale of the device the layout element is rendered to, that of
+# the transformations of the layout elements being taken into account; when
+# given, only the given children of the layout element are compiled
+def compile_layout_element_with_lod(
+    layout_element, lod_policy, scale=1.0, children=None
+):
+    items = []
+    _compile_layout_element_with_lod(
+        layout_element,
+        lod_policy,
+        scale,
+        get_default_drawing_state(),
+        None,
+        items,
+        children,
+    )
+    return tuple(items)
@@ -1,17 +1,53 @@
 import dataclasses
 import typing
 import math
+import concurrent.futures
+import struct
+import zlib
 
 import skia
 
 import momapy.drawing
 import momapy.geometry
+import momapy.builder
+import momapy.caching
+import momapy.core
+import momapy.utils
 import momapy.rendering.core
 
+numpy = momapy.utils.lazy_import("numpy")
+
+# pictures recorded for frozen layout elements, keyed by the layout element,
+# the inherited drawing state and whether its children are recorded apart;
+# they are recorded with an R-tree so that their cull rect is their bounds
+picture_cache = momapy.caching.LRUCache("SkiaRenderer.pictures", max_size=16384)
+_picture_bounds = skia.Rect.MakeLTRB(-1e9, -1e9, 1e9, 1e9)
+
+# paints are made once per renderer for each distinct stroke or fill state
+paint_cache_info = momapy.caching.CacheInfo()
+momapy.caching.cache_infos["SkiaRenderer.paints"] = paint_cache_info
+
+# skia paths are made once per renderer for each path that translated paths
+# are translated from
+path_cache_info = momapy.caching.CacheInfo()
+momapy.caching.cache_infos["SkiaRenderer.paths"] = path_cache_info
+
 
 @dataclasses.dataclass
 class SkiaRenderer(momapy.rendering.core.Renderer):
-    formats: typing.ClassVar[list[str]] = ["pdf", "svg", "png", "jpeg", "webp"]
+    formats: typing.ClassVar[list[str]] = [
+        "pdf",
+        "svg",
+        "png",
+        "jpeg",
+        "webp",
+        "array",
+    ]
+    _encoded_image_formats: typing.ClassVar[dict] = {
+        "png": skia.kPNG,
+        "jpeg": skia.kJPEG,
+        "webp": skia.kWEBP,
+    }
     _de_class_func_mapping: typing.ClassVar[dict] = {
         momapy.drawing.Group: "_render_group",
         momapy.drawing.Path: "_render_path",
@@ -58,13 +94,18 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
     config: dict = dataclasses.field(default_factory=dict)
     _skia_typefaces: dict = dataclasses.field(default_factory=dict)
     _skia_fonts: dict = dataclasses.field(default_factory=dict)
+    _skia_paints: dict = dataclasses.field(default_factory=dict)
+    _skia_paths: dict = dataclasses.field(default_factory=dict)
 
+    # the output file is either a file path or a binary file object; with
+    # the array format, the map is rendered directly into the pixels of a
+    # (height, width, 4) RGBA numpy array, set as the "array" config key
     @classmethod
     def from_file(cls, output_file, width, height, format_, config=None):
         if config is None:
             config = {}
         if format_ == "pdf":
-            stream = skia.FILEWStream(output_file)
+            stream = cls._make_stream(output_file)
             document = skia.PDF.MakeDocument(stream)
             canvas = document.beginPage(width, height)
             config["stream"] = stream
@@ -74,8 +115,14 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
             canvas = surface.getCanvas()
             config["surface"] = surface
             config["output_file"] = output_file
+        elif format_ == "array":
+            array = numpy.zeros((int(height), int(width), 4), dtype=numpy.uint8)
+            surface = skia.Surface(array)
+            canvas = surface.getCanvas()
+            config["surface"] = surface
+            config["array"] = array
         elif format_ == "svg":
-            stream = skia.FILEWStream(output_file)
+            stream = cls._make_stream(output_file)
             canvas = skia.SVGCanvas.Make((width, height), stream)
             config["stream"] = stream
         config["output_file"] = output_file
@@ -92,24 +139,38 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
         self._stroke_dasharray = None
         self._stroke_dashoffset = self.default_stroke_dashoffset
 
+    @classmethod
+    def _make_stream(cls, output_file):
+        if momapy.rendering.core.is_file_path(output_file):
+            return skia.FILEWStream(str(output_file))
+        return skia.DynamicMemoryWStream()
+
+    def _write_stream(self):
+        stream = self.config["stream"]
+        if isinstance(stream, skia.DynamicMemoryWStream):
+            self.config["output_file"].write(bytes(stream.detachAsData()))
+        else:
+            stream.flush()
+
     def end_session(self):
         self.canvas.flush()
         format_ = self.config.get("format")
         if format_ == "pdf":
             self.config["document"].endPage()
             self.config["document"].close()
-        elif format_ == "png":
-            image = self.config["surface"].makeImageSnapshot()
-            image.save(self.config["output_file"], skia.kPNG)
-        elif format_ == "jpeg":
-            image = self.config["surface"].makeImageSnapshot()
-            image.save(self.config["output_file"], skia.kJPEG)
-        elif format_ == "webp":
+            self._write_stream()
+        elif format_ in ["png", "jpeg", "webp"]:
             image = self.config["surface"].makeImageSnapshot()
-            image.save(self.config["output_file"], skia.kWEBP)
+            output_file = self.config["output_file"]
+            encoded_image_format = self._encoded_image_formats[format_]
+            if momapy.rendering.core.is_file_path(output_file):
+                image.save(str(output_file), encoded_image_format)
+            else:
+                data = image.encodeToData(encoded_image_format, 100)
+                output_file.write(bytes(data))
         elif format_ == "svg":
             del self.canvas
-            self.config["stream"].flush()
+            self._write_stream()
 
     def new_page(self, width, height):
         format_ = self.config.get("format")
@@ -118,13 +179,187 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
             canvas = self.config["document"].beginPage(width, height)
             self.canvas = canvas
 
-    def render_map(self, map_):
-        self.render_layout_element(map_.layout)
+    def render_map(self, map_, viewport=None):
+        if viewport is None:
+            self.render_layout_element(map_.layout)
+        else:
+            north_west = viewport.north_west()
+            self.canvas.save()
+            self.canvas.translate(-north_west.x, -north_west.y)
+            self.canvas.clipRect(
+                skia.Rect.MakeXYWH(
+                    north_west.x, north_west.y, viewport.width, viewport.height
+                )
+            )
+            lod_policy = self.config.get("lod_policy")
+            if (
+                lod_policy is None
+                and self.config.get("cache_pictures", True)
+                and momapy.caching.enabled
+                and momapy.rendering.core.is_splittable(map_.layout)
+            ):
+                children = momapy.rendering.core.get_children_in_viewport(
+                    map_.layout, viewport
+                )
+                self._render_layout_element_children(
+                    map_.layout,
+                    momapy.rendering.core.get_default_drawing_state(),
+                    children,
+                )
+            else:
+                if lod_policy is not None:
+                    scale = self._get_device_scale()
+                else:
+                    scale = 1.0
+                display_list = (
+                    momapy.rendering.core.compile_layout_element_in_viewport(
+                        map_.layout, viewport, lod_policy, scale
+                    )
+                )
+                self.render_display_list(display_list)
+            self.canvas.restore()
 
     def render_layout_element(self, layout_element):
-        drawing_elements = layout_element.drawing_elements()
-        for drawing_element in drawing_elements:
-            self.render_drawing_element(drawing_element)
+        lod_policy = self.config.get("lod_policy")
+        if lod_policy is not None:
+            display_list = (
+                momapy.rendering.core.compile_layout_element_with_lod(
+                    layout_element, lod_policy, self._get_device_scale()
+                )
+            )
+            self.render_display_list(display_list)
+        elif self.config.get("cache_pictures", True) and momapy.caching.enabled:
+            state = momapy.rendering.core.get_default_drawing_state()
+            picture = self._get_layout_element_picture(
+                layout_element, state, split=True
+            )
+            self.canvas.drawPicture(picture)
+        else:
+            display_list = momapy.rendering.core.compile_layout_element(
+                layout_element
+            )
+            self.render_display_list(display_list)
+
+    # the bounds of what a layout element draws with the given inherited state,
+    # strokes and filters included, from its recorded picture
+    def get_layout_element_bounds(self, layout_element, state=None):
+        if state is None:
+            state = momapy.rendering.core.get_default_drawing_state()
+        picture = self._get_layout_element_picture(layout_element, state)
+        rect = picture.cullRect()
+        return momapy.geometry.Bbox.from_bounds(
+            (rect.left(), rect.top(), rect.right(), rect.bottom())
+        )
+
+    # a layout element is split when its children are recorded in their own
+    # pictures, so that only the children that changed between two renderings
+    # are recorded again; builders are always recorded again
+    def _get_layout_element_picture(self, layout_element, state, split=False):
+        if isinstance(layout_element, momapy.builder.Builder):
+            return self._record_layout_element(layout_element, state, split)
+        key = (layout_element, state, split)
+        picture = picture_cache.get(key)
+        if picture is None:
+            picture = self._record_layout_element(layout_element, state, split)
+            picture_cache.set(key, picture)
+        return picture
+
+    def _render_layout_element_children(self, layout_element, state, children):
+        state = momapy.rendering.core.get_drawing_state(layout_element, state)
+        transform = momapy.rendering.core.get_drawing_transform(
+            layout_element, None
+        )
+        self.canvas.save()
+        if transform is not None:
+            self.canvas.concat(self._make_skia_matrix(transform))
+        display_list = momapy.rendering.core.compile_drawing_elements(
+            layout_element.self_drawing_elements(), state
+        )
+        self.render_display_list(display_list)
+        for child in children:
+            if child is not None:
+                picture = self._get_layout_element_picture(child, state)
+                self.canvas.drawPicture(picture)
+        self.canvas.restore()
+
+    def _record_layout_element(self, layout_element, state, split=False):
+        saved_canvas = self.canvas
+        recorder = skia.PictureRecorder()
+        self.canvas = recorder.beginRecording(
+            _picture_bounds, skia.RTreeFactory()()
+        )
+        if split and momapy.rendering.core.is_splittable(layout_element):
+            self._render_layout_element_children(
+                layout_element, state, layout_element.children()
+            )
+        else:
+            display_list = momapy.rendering.core.compile_drawing_elements(
+                layout_element.drawing_elements(), state
+            )
+            self.render_display_list(display_list)
+        picture = recorder.finishRecordingAsPicture()
+        self.canvas = saved_canvas
+        return picture
+
+    def render_display_list(self, display_list):
+        state = self._get_state()
+        for item in display_list:
+            self._render_display_item(item)
+        self._set_state(state)
+
+    def _render_display_item(self, item):
+        self._stroke = item.stroke
+        self._fill = item.fill
+        self._stroke_width = item.stroke_width
+        self._stroke_dasharray = item.stroke_dasharray
+        self._stroke_dashoffset = item.stroke_dashoffset
+        if item.transform is not None:
+            self.canvas.save()
+            self.canvas.concat(self._make_skia_matrix(item.transform))
+        if isinstance(item, momapy.rendering.core.DisplayGroupItem):
+            self._render_display_group_item(item)
+        else:
+            class_ = type(item.drawing_element)
+            if issubclass(class_, momapy.builder.Builder):
+                class_ = class_._cls_to_build
+            de_func = getattr(self, self._de_class_func_mapping[class_])
+            de_func(item.drawing_element)
+        if item.transform is not None:
+            self.canvas.restore()
+
+    def _render_display_group_item(self, item):
+        group = item.drawing_element
+        bbox = group.bbox()
+        saved_canvas = self.canvas
+        recorder = skia.PictureRecorder()
+        self.canvas = recorder.beginRecording(
+            skia.Rect.MakeXYWH(
+                bbox.north_west().x,
+                bbox.north_west().y,
+                bbox.width,
+                bbox.height,
+            )
+        )
+        self.render_display_list(item.items)
+        picture = recorder.finishRecordingAsPicture()
+        skia_paint = self._make_filter_paint(
+            item.filter, group.get_filter_region()
+        )
+        self.canvas = saved_canvas
+        self.canvas.drawPicture(picture, paint=skia_paint)
+
+    def _get_device_scale(self):
+        matrix = self.canvas.getTotalMatrix()
+        return math.sqrt(
+            abs(
+                matrix.getScaleX() * matrix.getScaleY()
+                - matrix.getSkewX() * matrix.getSkewY()
+            )
+        )
+
+    def _make_skia_matrix(self, transform):
+        xx, yx, xy, yy, x0, y0 = transform
+        return skia.Matrix.MakeAll(xx, xy, x0, yx, yy, y0, 0.0, 0.0, 1.0)
 
     def render_drawing_element(self, drawing_element):
         self._save()
@@ -137,14 +372,17 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
         de_func(drawing_element)
         self._restore()
 
-    def _save(self):
-        state = {
+    def _get_state(self):
+        return {
             "stroke": self._stroke,
             "fill": self._fill,
             "stroke_width": self._stroke_width,
             "stroke_dasharray": self._stroke_dasharray,
             "stroke_dashoffset": self._stroke_dashoffset,
         }
+
+    def _save(self):
+        state = self._get_state()
         self._states.append(state)
         self.canvas.save()
 
@@ -189,6 +427,35 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
     def _set_new_path(self):
         pass
 
+    def _get_paint(self, key, make_paint):
+        if not momapy.caching.enabled:
+            return make_paint()
+        try:
+            skia_paint = self._skia_paints.get(key)
+        except TypeError:  # states holding builders are not hashable
+            return make_paint()
+        if skia_paint is None:
+            paint_cache_info.misses += 1
+            skia_paint = make_paint()
+            self._skia_paints[key] = skia_paint
+        else:
+            paint_cache_info.hits += 1
+        return skia_paint
+
+    def _get_stroke_paint(self):
+        key = (
+            "stroke",
+            self._stroke,
+            self._stroke_width,
+            self._stroke_dasharray,
+            self._stroke_dashoffset,
+        )
+        return self._get_paint(key, self._make_stroke_paint)
+
+    def _get_fill_paint(self):
+        key = ("fill", self._fill)
+        return self._get_paint(key, self._make_fill_paint)
+
     def _make_stroke_paint(self):
         if self._stroke_dasharray is not None:
             skia_path_effect = skia.DashPathEffect.Make(
@@ -389,13 +656,33 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
             self._add_path_action_to_skia_path(skia_path, path_action)
         return skia_path
 
+    def _get_skia_path(self, path):
+        translation = path.get_translation()
+        if translation is None or not momapy.caching.enabled:
+            return self._make_skia_path(path)
+        untranslated_path, tx, ty = translation
+        cached = self._skia_paths.get(id(untranslated_path))
+        if cached is None or cached[0] is not untranslated_path:
+            path_cache_info.misses += 1
+            skia_path = self._make_skia_path(untranslated_path)
+            self._skia_paths[id(untranslated_path)] = (
+                untranslated_path,
+                skia_path,
+            )
+        else:
+            path_cache_info.hits += 1
+            skia_path = cached[1]
+        translated_skia_path = skia.Path()
+        skia_path.offset(tx, ty, translated_skia_path)
+        return translated_skia_path
+
     def _render_path(self, path):
-        skia_path = self._make_skia_path(path)
+        skia_path = self._get_skia_path(path)
         if self._fill is not None:
-            skia_paint = self._make_fill_paint()
+            skia_paint = self._get_fill_paint()
             self.canvas.drawPath(path=skia_path, paint=skia_paint)
         if self._stroke is not None:
-            skia_paint = self._make_stroke_paint()
+            skia_paint = self._get_stroke_paint()
             self.canvas.drawPath(path=skia_path, paint=skia_paint)
 
     def _render_text(self, text):
@@ -418,7 +705,7 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
                 )
             ] = skia_font
         if self._fill is not None:
-            skia_paint = self._make_fill_paint()
+            skia_paint = self._get_fill_paint()
             self.canvas.drawString(
                 text=text.text,
                 x=text.x,
@@ -427,7 +714,7 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
                 paint=skia_paint,
             )
         if self._stroke is not None:
-            skia_paint = self._make_stroke_paint()
+            skia_paint = self._get_stroke_paint()
             self.canvas.drawString(
                 text=text.text,
                 x=text.x,
@@ -444,10 +731,10 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
             ellipse.y + ellipse.ry,
         )
         if self._fill is not None:
-            skia_paint = self._make_fill_paint()
+            skia_paint = self._get_fill_paint()
             self.canvas.drawOval(oval=skia_rect, paint=skia_paint)
         if self._stroke is not None:
-            skia_paint = self._make_stroke_paint()
+            skia_paint = self._get_stroke_paint()
             self.canvas.drawOval(oval=skia_rect, paint=skia_paint)
 
     def _render_rectangle(self, rectangle):
@@ -458,7 +745,7 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
             rectangle.y + rectangle.height,
         )
         if self._fill is not None:
-            skia_paint = self._make_fill_paint()
+            skia_paint = self._get_fill_paint()
             self.canvas.drawRoundRect(
                 rect=skia_rect,
                 rx=rectangle.rx,
@@ -466,7 +753,7 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
                 paint=skia_paint,
             )
         if self._stroke is not None:
-            skia_paint = self._make_stroke_paint()
+            skia_paint = self._get_stroke_paint()
             self.canvas.drawRoundRect(
                 rect=skia_rect,
                 rx=rectangle.rx,
@@ -551,3 +838,245 @@ class SkiaRenderer(momapy.rendering.core.Renderer):
 
 
 momapy.rendering.core.register_renderer("skia", SkiaRenderer)
+
+
+# state of the worker processes of tiled renderers, set by their initializer
+_tile_worker_state = {}
+
+
+def _init_tile_worker(picture_data, color_type, alpha_type):
+    picture = skia.Picture.MakeFromData(picture_data)
+    # recorded again with a bounding box hierarchy, so that drawing the picture
+    # onto a tile only plays back the operations intersecting the tile
+    recorder = skia.PictureRecorder()
+    bbh = skia.RTreeFactory()()
+    canvas = recorder.beginRecording(picture.cullRect(), bbh)
+    canvas.drawPicture(picture)
+    _tile_worker_state["picture"] = recorder.finishRecordingAsPicture()
+    _tile_worker_state["color_type"] = skia.ColorType(color_type)
+    _tile_worker_state["alpha_type"] = skia.AlphaType(alpha_type)
+
+
+def _render_tile_image(tile):
+    x, y, width, height = tile
+    surface = skia.Surface.MakeRaster(
+        skia.ImageInfo.Make(
+            width,
+            height,
+            _tile_worker_state["color_type"],
+            _tile_worker_state["alpha_type"],
+        )
+    )
+    canvas = surface.getCanvas()
+    canvas.translate(-x, -y)
+    canvas.drawPicture(_tile_worker_state["picture"])
+    canvas.flush()
+    return surface.makeImageSnapshot()
+
+
+def _render_tile(tile):
+    return _render_tile_image(tile).tobytes()
+
+
+# a band of rows of a png image, rendered and compressed by a worker: rows are
+# filtered with the Sub filter, that does not depend on other rows, and
+# compressed into a raw deflate stream ending on a byte boundary, so that the
+# streams of consecutive bands can be concatenated; returns the compressed band
+# and the adler32 checksum and length of its filtered rows
+def _render_png_band(band):
+    x, y, width, height = band
+    pixels = (
+        _render_tile_image(band)
+        .toarray(
+            colorType=skia.ColorType.kRGBA_8888_ColorType,
+            alphaType=skia.AlphaType.kUnpremul_AlphaType,
+        )
+        .reshape((height, width * 4))
+    )
+    rows = numpy.empty((height, width * 4 + 1), dtype=numpy.uint8)
+    rows[:, 0] = 1
+    rows[:, 1:5] = pixels[:, :4]
+    rows[:, 5:] = pixels[:, 4:] - pixels[:, :-4]
+    data = rows.tobytes()
+    compressor = zlib.compressobj(wbits=-15)
+    compressed_data = compressor.compress(data)
+    if y + height == _tile_worker_state["height"]:
+        compressed_data += compressor.flush(zlib.Z_FINISH)
+    else:
+        compressed_data += compressor.flush(zlib.Z_SYNC_FLUSH)
+    return compressed_data, zlib.adler32(data), len(data)
+
+
+def _init_png_worker(picture_data, color_type, alpha_type, height):
+    _init_tile_worker(picture_data, color_type, alpha_type)
+    _tile_worker_state["height"] = height
+
+
+def _combine_adler32(adler1, adler2, length2):
+    base = 65521
+    remainder = length2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = (remainder * sum1) % base
+    sum1 = (sum1 + (adler2 & 0xFFFF) + base - 1) % base
+    sum2 = (
+        sum2 + ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + base
+    ) - remainder
+    return sum1 | ((sum2 % base) << 16)
+
+
+def _make_png_chunk(chunk_type, data):
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+# renders raster pages by tiles in a pool of processes: everything drawn is
+# recorded to a skia.Picture, which each worker plays back onto its tiles,
+# culling the drawing operations outside them. PNG images are rendered by bands
+# of rows holding about as many pixels as a tile, that workers also compress
+# and the renderer writes in order, so that no full-size page is ever made.
+# JPEG and WebP images have no such streaming encoder in skia: their tiles are
+# drawn onto a full-size page that is then encoded on one thread, and the
+# array format renders the tiles into the output array. Config keys: tile_size
+# (in pixels) and max_workers (defaults to the number of CPUs)
+@dataclasses.dataclass
+class TiledSkiaRenderer(SkiaRenderer):
+    formats: typing.ClassVar[list[str]] = ["png", "jpeg", "webp", "array"]
+    default_tile_size: typing.ClassVar[int] = 2048
+
+    @classmethod
+    def from_file(cls, output_file, width, height, format_, config=None):
+        if format_ not in cls.formats:
+            raise ValueError(
+                f"unsupported format '{format_}' for {cls.__name__}"
+            )
+        if config is None:
+            config = {}
+        recorder = skia.PictureRecorder()
+        canvas = recorder.beginRecording(
+            skia.Rect.MakeWH(int(width), int(height))
+        )
+        config["recorder"] = recorder
+        if format_ == "array":
+            config["array"] = numpy.zeros(
+                (int(height), int(width), 4), dtype=numpy.uint8
+            )
+        config["output_file"] = output_file
+        config["width"] = width
+        config["height"] = height
+        config["format"] = format_
+        return cls(canvas=canvas, config=config)
+
+    def end_session(self):
+        picture = self.config["recorder"].finishRecordingAsPicture()
+        if self.config["format"] == "png":
+            self._write_png(picture)
+            return
+        if self.config["format"] == "array":
+            surface = skia.Surface(self.config["array"])
+        else:
+            surface = skia.Surface(
+                width=int(self.config["width"]),
+                height=int(self.config["height"]),
+            )
+        self.config["surface"] = surface
+        self.canvas = surface.getCanvas()
+        self._render_tiles(picture)
+        super().end_session()
+
+    def _get_tiles(self):
+        width = int(self.config["width"])
+        height = int(self.config["height"])
+        tile_size = self.config.get("tile_size", self.default_tile_size)
+        tiles = []
+        for y in range(0, height, tile_size):
+            for x in range(0, width, tile_size):
+                tiles.append(
+                    (
+                        x,
+                        y,
+                        min(tile_size, width - x),
+                        min(tile_size, height - y),
+                    )
+                )
+        return tiles
+
+    def _get_bands(self):
+        width = int(self.config["width"])
+        height = int(self.config["height"])
+        tile_size = self.config.get("tile_size", self.default_tile_size)
+        band_height = max(tile_size * tile_size // width, 1)
+        return [
+            (0, y, width, min(band_height, height - y))
+            for y in range(0, height, band_height)
+        ]
+
+    def _render_tiles(self, picture):
+        tiles = self._get_tiles()
+        image_info = self.config["surface"].imageInfo()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.config.get("max_workers"),
+            initializer=_init_tile_worker,
+            initargs=(
+                bytes(picture.serialize()),
+                int(image_info.colorType()),
+                int(image_info.alphaType()),
+            ),
+        ) as executor:
+            for tile, pixels in zip(tiles, executor.map(_render_tile, tiles)):
+                x, y, width, height = tile
+                image = skia.Image.frombytes(
+                    pixels,
+                    (width, height),
+                    colorType=image_info.colorType(),
+                    alphaType=image_info.alphaType(),
+                )
+                self.canvas.drawImage(image, x, y)
+
+    def _write_png(self, picture):
+        width = int(self.config["width"])
+        height = int(self.config["height"])
+        output_file = self.config["output_file"]
+        if momapy.rendering.core.is_file_path(output_file):
+            f = open(output_file, "wb")
+        else:
+            f = output_file
+        try:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            f.write(
+                _make_png_chunk(
+                    b"IHDR",
+                    struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0),
+                )
+            )
+            f.write(_make_png_chunk(b"IDAT", b"\x78\x9c"))
+            adler = 1
+            bands = self._get_bands()
+            # the pixels of the untiled renderer's pages
+            image_info = skia.ImageInfo.MakeN32Premul(width, height)
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.config.get("max_workers"),
+                initializer=_init_png_worker,
+                initargs=(
+                    bytes(picture.serialize()),
+                    int(image_info.colorType()),
+                    int(image_info.alphaType()),
+                    height,
+                ),
+            ) as executor:
+                for compressed_data, band_adler, length in executor.map(
+                    _render_png_band, bands
+                ):
+                    f.write(_make_png_chunk(b"IDAT", compressed_data))
+                    adler = _combine_adler32(adler, band_adler, length)
+            f.write(_make_png_chunk(b"IDAT", struct.pack(">I", adler)))
+            f.write(_make_png_chunk(b"IEND", b""))
+        finally:
+            if f is not output_file:
+                f.close()
+
+
+momapy.rendering.core.register_renderer("skia-tiled", TiledSkiaRenderer)
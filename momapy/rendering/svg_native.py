@@ -1,4 +1,6 @@
 import dataclasses
+import io
+import itertools
 import typing
 import math
 
@@ -6,6 +8,7 @@ import skia
 
 import momapy.drawing
 import momapy.geometry
+import momapy.builder
 import momapy.rendering.core
 
 
@@ -17,7 +20,19 @@ class SVGElement(object):
     elements: list["SVGElement"] = dataclasses.field(default_factory=list)
 
     def __str__(self):
-        s_value = self.value if self.value is not None else ""
+        f = io.StringIO()
+        self.write(f)
+        return f.getvalue()
+
+    def write(self, f):
+        self.write_start(f)
+        for i, element in enumerate(self.elements):
+            if i > 0:
+                f.write("\n")
+            element.write(f)
+        self.write_end(f)
+
+    def write_start(self, f):
         if self.attributes:
             l_s_attributes = []
             for attr_name, attr_value in self.attributes.items():
@@ -28,11 +43,12 @@ class SVGElement(object):
             s_attributes = f" {' '.join(l_s_attributes)}"
         else:
             s_attributes = ""
-        if self.elements:
-            s_elements = "\n".join([str(child) for child in self.elements])
-        else:
-            s_elements = ""
-        return f"<{self.name}{s_attributes}>\n{s_value}{s_elements}</{self.name}>\n"
+        f.write(f"<{self.name}{s_attributes}>\n")
+        if self.value is not None:
+            f.write(str(self.value))
+
+    def write_end(self, f):
+        f.write(f"</{self.name}>\n")
 
     def add_element(self, element):
         self.elements.append(element)
@@ -99,6 +115,9 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
     svg: SVGElement
     config: dict = dataclasses.field(default_factory=dict)
     _filter_elements: list[SVGElement] = dataclasses.field(default_factory=list)
+    _filter_ids: dict = dataclasses.field(default_factory=dict)
+    _path_ids: dict = dataclasses.field(default_factory=dict)
+    _path_elements: list[SVGElement] = dataclasses.field(default_factory=list)
 
     @classmethod
     def from_file(cls, output_file, width, height, format_, config=None):
@@ -108,39 +127,129 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
         config["width"] = width
         config["height"] = height
         config["format"] = format_
-        svg = SVGElement(
-            name="svg",
-            attributes={
-                "xmlns": "http://www.w3.org/2000/svg",
-                "viewBox": f"0 0 {width} {height}",
-            },
-        )
+        attributes = {
+            "xmlns": "http://www.w3.org/2000/svg",
+            "viewBox": f"0 0 {width} {height}",
+        }
+        if config.get("streaming"):
+            attributes["xmlns:xlink"] = "http://www.w3.org/1999/xlink"
+        svg = SVGElement(name="svg", attributes=attributes)
         return cls(svg=svg, config=config)
 
+    # in streaming mode, elements are written to the output file as soon as
+    # they are made, and paths that only differ by a translation are written
+    # once in the defs and then referenced with use elements
     def begin_session(self):
-        pass
+        if self.config.get("streaming"):
+            self._file = self._open_output_file()
+            self.svg.write_start(self._file)
+            self._n_written_elements = 0
 
     def end_session(self):
-        if self._filter_elements:
-            defs = SVGElement(name="defs", elements=self._filter_elements)
-            self.svg.add_element(defs)
-        with open(self.config["output_file"], "w") as f:
-            f.write(str(self.svg))
+        defs_elements = self._filter_elements + self._path_elements
+        if defs_elements:
+            defs = SVGElement(name="defs", elements=defs_elements)
+            self._add_element(defs)
+        if self.config.get("streaming"):
+            self.svg.write_end(self._file)
+            self._close_output_file(self._file)
+        else:
+            f = self._open_output_file()
+            self.svg.write(f)
+            self._close_output_file(f)
+
+    # the output file is either a file path, a text file object or a binary
+    # file object; file objects are left open
+    def _open_output_file(self):
+        output_file = self.config["output_file"]
+        if momapy.rendering.core.is_file_path(output_file):
+            return open(
+                output_file,
+                "w",
+                buffering=self.config.get("buffer_size", 1 << 16),
+            )
+        if isinstance(output_file, io.TextIOBase):
+            return output_file
+        return io.TextIOWrapper(output_file, encoding="utf-8")
+
+    def _close_output_file(self, f):
+        output_file = self.config["output_file"]
+        if momapy.rendering.core.is_file_path(output_file):
+            f.close()
+        elif f is not output_file:
+            f.flush()
+            f.detach()
 
     def new_page(self, width, height):
         pass
 
-    def render_map(self, map_):
-        self.render_layout_element(map_.layout)
+    # the viewport is rendered in a nested svg element, that clips its content
+    def render_map(self, map_, viewport=None):
+        if viewport is None:
+            self.render_layout_element(map_.layout)
+        else:
+            north_west = viewport.north_west()
+            display_list = (
+                momapy.rendering.core.compile_layout_element_in_viewport(
+                    map_.layout, viewport, self.config.get("lod_policy")
+                )
+            )
+            element = SVGElement(
+                name="svg",
+                attributes={
+                    "width": viewport.width,
+                    "height": viewport.height,
+                    "viewBox": (
+                        f"{north_west.x} {north_west.y} "
+                        f"{viewport.width} {viewport.height}"
+                    ),
+                },
+                elements=self._make_display_list_elements(display_list),
+            )
+            self._add_element(element)
 
     def render_layout_element(self, layout_element):
-        drawing_elements = layout_element.drawing_elements()
-        for drawing_element in drawing_elements:
-            self.render_drawing_element(drawing_element)
+        lod_policy = self.config.get("lod_policy")
+        if lod_policy is not None:
+            display_list = (
+                momapy.rendering.core.compile_layout_element_with_lod(
+                    layout_element, lod_policy
+                )
+            )
+        else:
+            display_list = momapy.rendering.core.compile_layout_element(
+                layout_element
+            )
+        self.render_display_list(display_list)
+
+    def render_display_list(self, display_list):
+        for element in self._make_display_list_elements(display_list):
+            self._add_element(element)
 
     def render_drawing_element(self, drawing_element):
         element = self._make_drawing_element_element(drawing_element)
-        self.svg.add_element(element)
+        self._add_element(element)
+
+    def _add_element(self, element):
+        if self.config.get("streaming"):
+            if self._n_written_elements > 0:
+                self._file.write("\n")
+            element.write(self._file)
+            self._n_written_elements += 1
+        else:
+            self.svg.add_element(element)
+
+    # filters that only differ by their id are written once
+    def _get_filter_id(self, filter_):
+        if isinstance(filter_, momapy.builder.Builder):
+            filter_ = momapy.builder.object_from_builder(filter_)
+        filter_id = self._filter_ids.get(filter_)
+        if filter_id is None:
+            filter_id = filter_.id
+            self._filter_ids[filter_] = filter_id
+            filter_element = self._make_filter_element(filter_)
+            self._filter_elements.append(filter_element)
+        return filter_id
 
     def _make_color_value(self, color):
         return f"rgb({color.red}, {color.green}, {color.blue})"
@@ -205,13 +314,105 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
             drawing_element.filter is not None
             and drawing_element.filter is not momapy.drawing.NoneValue
         ):
-            filter_element = self._make_filter_element(drawing_element.filter)
-            if filter_element not in self._filter_elements:
-                self._filter_elements.append(filter_element)
-            attributes["filter"] = f"url(#{drawing_element.filter.id})"
+            filter_id = self._get_filter_id(drawing_element.filter)
+            attributes["filter"] = f"url(#{filter_id})"
 
         return attributes
 
+    def _get_display_item_state(self, item):
+        return (item.stroke, item.fill, item.stroke_width)
+
+    # the state the root svg element gives to its elements
+    def _get_initial_display_state(self):
+        return (
+            None,
+            momapy.rendering.core.Renderer.default_fill,
+            momapy.rendering.core.Renderer.default_stroke_width,
+        )
+
+    # only the attributes of the state that differ from the state inherited
+    # from the enclosing element are written
+    def _make_display_state_attributes(self, state, inherited_state):
+        attributes = {}
+        stroke, fill, stroke_width = state
+        inherited_stroke, inherited_fill, inherited_stroke_width = (
+            inherited_state
+        )
+        if stroke != inherited_stroke:
+            if stroke is None:
+                attributes["stroke"] = "none"
+            else:
+                attributes["stroke-opacity"] = self._make_opacity_value(stroke)
+                attributes["stroke"] = self._make_color_value(stroke)
+        if fill != inherited_fill:
+            if fill is None:
+                attributes["fill"] = "none"
+            else:
+                attributes["fill-opacity"] = self._make_opacity_value(fill)
+                attributes["fill"] = self._make_color_value(fill)
+        if stroke_width != inherited_stroke_width:
+            attributes["stroke-width"] = stroke_width
+        return attributes
+
+    def _make_display_item_attributes(self, item, inherited_state):
+        attributes = self._make_display_state_attributes(
+            self._get_display_item_state(item), inherited_state
+        )
+        if item.transform is not None:
+            attributes["transform"] = (
+                f"matrix({' '.join([str(value) for value in item.transform])})"
+            )
+        if item.filter is not None:
+            filter_id = self._get_filter_id(item.filter)
+            attributes["filter"] = f"url(#{filter_id})"
+        return attributes
+
+    # consecutive display items with the same state are gathered in a group
+    # holding the attributes of that state, so that their elements inherit it
+    def _make_display_list_elements(self, display_list, inherited_state=None):
+        if inherited_state is None:
+            inherited_state = self._get_initial_display_state()
+        elements = []
+        for state, items in itertools.groupby(
+            display_list, key=self._get_display_item_state
+        ):
+            items = list(items)
+            if len(items) > 1 and state != inherited_state:
+                element = SVGElement(
+                    name="g",
+                    attributes=self._make_display_state_attributes(
+                        state, inherited_state
+                    ),
+                    elements=[
+                        self._make_display_item_element(item, state)
+                        for item in items
+                    ],
+                )
+                elements.append(element)
+            else:
+                elements += [
+                    self._make_display_item_element(item, inherited_state)
+                    for item in items
+                ]
+        return elements
+
+    def _make_display_item_element(self, item, inherited_state):
+        attributes = self._make_display_item_attributes(item, inherited_state)
+        if isinstance(item, momapy.rendering.core.DisplayGroupItem):
+            subelements = self._make_display_list_elements(
+                item.items, self._get_display_item_state(item)
+            )
+            element = SVGElement(
+                name="g", attributes=attributes, elements=subelements
+            )
+        else:
+            class_ = type(item.drawing_element)
+            if issubclass(class_, momapy.builder.Builder):
+                class_ = class_._cls_to_build
+            de_func = getattr(self, self._de_class_func_mapping[class_])
+            element = de_func(item.drawing_element, attributes=attributes)
+        return element
+
     def _make_filter_element(self, filter_):
         name = "filter"
         attributes = {}
@@ -394,9 +595,16 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
             f"{curve_to.y}"
         )
 
-    def _make_path_element(self, path):
+    def _make_path_element(self, path, attributes=None):
         name = "path"
-        attributes = self._make_drawing_element_generic_attributes(path)
+        if attributes is None:
+            attributes = self._make_drawing_element_generic_attributes(path)
+        if (
+            self.config.get("streaming")
+            and path.actions
+            and hasattr(path.actions[0], "point")
+        ):
+            return self._make_translated_path_element(path, attributes)
         d_value = " ".join(
             [
                 self._make_path_action_value(path_action)
@@ -407,9 +615,47 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
         element = SVGElement(name=name, attributes=attributes)
         return element
 
-    def _make_text_element(self, text):
+    # the path is written relative to its first point; the first time a
+    # relative path is met it is written in place, and the next times it is
+    # referenced from the defs
+    def _make_translated_path_element(self, path, attributes):
+        origin = path.actions[0].point
+        d_value = " ".join(
+            [
+                self._make_path_action_value(
+                    _get_translated_path_action(
+                        path_action, -origin.x, -origin.y
+                    )
+                )
+                for path_action in path.actions
+            ]
+        )
+        translation_value = f"translate({origin.x} {origin.y})"
+        if "transform" in attributes:
+            attributes["transform"] = (
+                f"{attributes['transform']} {translation_value}"
+            )
+        else:
+            attributes["transform"] = translation_value
+        if d_value not in self._path_ids:
+            self._path_ids[d_value] = None
+            attributes["d"] = d_value
+            return SVGElement(name="path", attributes=attributes)
+        path_id = self._path_ids[d_value]
+        if path_id is None:
+            path_id = f"path{len(self._path_elements)}"
+            self._path_ids[d_value] = path_id
+            path_element = SVGElement(
+                name="path", attributes={"id": path_id, "d": d_value}
+            )
+            self._path_elements.append(path_element)
+        attributes["xlink:href"] = f"#{path_id}"
+        return SVGElement(name="use", attributes=attributes)
+
+    def _make_text_element(self, text, attributes=None):
         name = "text"
-        attributes = self._make_drawing_element_generic_attributes(text)
+        if attributes is None:
+            attributes = self._make_drawing_element_generic_attributes(text)
         attributes["x"] = text.x
         attributes["y"] = text.y
         attributes["font-size"] = text.font_size
@@ -418,9 +664,10 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
         element = SVGElement(name=name, attributes=attributes, value=value)
         return element
 
-    def _make_ellipse_element(self, ellipse):
+    def _make_ellipse_element(self, ellipse, attributes=None):
         name = "ellipse"
-        attributes = self._make_drawing_element_generic_attributes(ellipse)
+        if attributes is None:
+            attributes = self._make_drawing_element_generic_attributes(ellipse)
         attributes["cx"] = ellipse.x
         attributes["cy"] = ellipse.y
         attributes["rx"] = ellipse.rx
@@ -428,9 +675,12 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
         element = SVGElement(name=name, attributes=attributes)
         return element
 
-    def _make_rectangle_element(self, rectangle):
+    def _make_rectangle_element(self, rectangle, attributes=None):
         name = "rect"
-        attributes = self._make_drawing_element_generic_attributes(rectangle)
+        if attributes is None:
+            attributes = self._make_drawing_element_generic_attributes(
+                rectangle
+            )
         attributes["x"] = rectangle.x
         attributes["y"] = rectangle.y
         attributes["width"] = rectangle.width
@@ -466,6 +716,21 @@ class SVGNativeRenderer(momapy.rendering.core.Renderer):
         return value
 
 
+def _get_translated_path_action(path_action, tx, ty):
+    changes = {}
+    for field_name in [
+        "point",
+        "control_point",
+        "control_point1",
+        "control_point2",
+    ]:
+        if hasattr(path_action, field_name):
+            changes[field_name] = getattr(path_action, field_name) + (tx, ty)
+    if not changes:
+        return path_action
+    return dataclasses.replace(path_action, **changes)
+
+
 @dataclasses.dataclass
 class SVGNativeCompatRenderer(SVGNativeRenderer):
     def _make_filter_element(self, filter_):
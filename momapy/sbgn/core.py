@@ -39,22 +39,39 @@ class SBGNMap(momapy.core.Map):
 
 @dataclass(frozen=True)
 class _SBGNShapeBase(momapy.core.NodeLayout):
+    # the mixins the class of the element inherits from; lazy builder classes
+    # subclass the builder class they are made from, that is skipped too
+    def _get_mixin_bases(self):
+        cls = type(self)
+        if isinstance(self, momapy.builder.Builder):
+            cls = momapy.builder.get_or_make_builder_cls(self._cls_to_build)
+        return [
+            base
+            for base in cls.__mro__[1:]
+            if momapy.builder.issubclass_or_builder(base, _SBGNMixinBase)
+            and base is not _SBGNMixinBase
+            and base
+            is not momapy.builder.get_or_make_builder_cls(_SBGNMixinBase)
+        ]
+
     def border_drawing_element(self):
         drawing_elements = []
-        for base in type(self).__mro__:
-            if (
-                momapy.builder.issubclass_or_builder(base, _SBGNMixinBase)
-                and base is not _SBGNMixinBase
-                and base
-                is not momapy.builder.get_or_make_builder_cls(_SBGNMixinBase)
-                and base is not type(self)
-            ):
-                drawing_elements += getattr(base, "_mixin_drawing_elements")(
-                    self
-                )
+        for base in self._get_mixin_bases():
+            drawing_elements += getattr(base, "_mixin_drawing_elements")(self)
         group = momapy.drawing.Group(elements=drawing_elements)
         return group
 
+    def _self_border_primitives(self):
+        segments = []
+        elliptical_arcs = []
+        for base in self._get_mixin_bases():
+            mixin_primitives = getattr(base, "_mixin_border_primitives")(self)
+            if mixin_primitives is None:
+                return None
+            segments += mixin_primitives[0]
+            elliptical_arcs += mixin_primitives[1]
+        return segments, elliptical_arcs
+
 
 @dataclass(frozen=True)
 class _SBGNMixinBase(object):
@@ -63,6 +80,10 @@ class _SBGNMixinBase(object):
     def _mixin_drawing_elements(cls, obj):
         pass
 
+    @classmethod
+    def _mixin_border_primitives(cls, obj):
+        return None
+
 
 @dataclass(frozen=True)
 class _ConnectorsMixin(_SBGNMixinBase):
@@ -70,9 +91,9 @@ class _ConnectorsMixin(_SBGNMixinBase):
     right_connector_length: float
     left_connector_stroke_width: float
     right_connector_stroke_width: float
-    direction: Optional[
-        momapy.core.Direction
-    ] = momapy.core.Direction.HORIZONTAL
+    direction: Optional[momapy.core.Direction] = (
+        momapy.core.Direction.HORIZONTAL
+    )
 
     def base_left_connector(self):
         if self.direction == momapy.core.Direction.VERTICAL:
@@ -150,6 +171,34 @@ class _ConnectorsMixin(_SBGNMixinBase):
             )
         return [path_left, path_right]
 
+    @classmethod
+    def _mixin_border_primitives(cls, obj):
+        if obj.direction == momapy.core.Direction.VERTICAL:
+            left_end = obj.base_left_connector() - (
+                0,
+                obj.left_connector_length,
+            )
+            right_end = obj.base_right_connector() + (
+                0,
+                obj.right_connector_length,
+            )
+        else:
+            left_end = obj.base_left_connector() - (
+                obj.left_connector_length,
+                0,
+            )
+            right_end = obj.base_right_connector() + (
+                obj.right_connector_length,
+                0,
+            )
+        segments = []
+        for p1, p2 in [
+            (obj.base_left_connector(), left_end),
+            (obj.base_right_connector(), right_end),
+        ]:
+            segments.append((p1.x, p1.y, p2.x, p2.y))
+        return segments, []
+
 
 @dataclass(frozen=True)
 class _SimpleMixin(_SBGNMixinBase):
@@ -173,6 +222,10 @@ class _SimpleMixin(_SBGNMixinBase):
     def _mixin_drawing_elements(cls, obj):
         return obj._make_shape().drawing_elements()
 
+    @classmethod
+    def _mixin_border_primitives(cls, obj):
+        return obj._make_shape()._border_primitives()
+
 
 @dataclass(frozen=True)
 class _MultiMixin(_SBGNMixinBase):
@@ -259,6 +312,18 @@ class _MultiMixin(_SBGNMixinBase):
             drawing_elements += subunit.drawing_elements()
         return drawing_elements
 
+    @classmethod
+    def _mixin_border_primitives(cls, obj):
+        segments = []
+        elliptical_arcs = []
+        for subunit in obj._make_subunits():
+            subunit_primitives = subunit._border_primitives()
+            if subunit_primitives is None:
+                return None
+            segments += subunit_primitives[0]
+            elliptical_arcs += subunit_primitives[1]
+        return segments, elliptical_arcs
+
     def label_center(self):
         return self._make_subunit(self._n - 1).label_center()
 
@@ -283,3 +348,7 @@ class _TextMixin(_SBGNMixinBase):
     @classmethod
     def _mixin_drawing_elements(cls, obj):
         return obj._make_text_layout().drawing_elements()
+
+    @classmethod
+    def _mixin_border_primitives(cls, obj):
+        return [], []
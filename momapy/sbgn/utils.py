@@ -90,6 +90,18 @@ def set_nodes_to_fit_labels(map_builder, xsep=0, ysep=0):
 
 
 def set_arcs_to_borders(map_builder):
+    modulation_classes = (
+        momapy.builder.get_or_make_builder_cls(momapy.sbgn.pd.ModulationLayout),
+        momapy.builder.get_or_make_builder_cls(
+            momapy.sbgn.pd.StimulationLayout
+        ),
+        momapy.builder.get_or_make_builder_cls(momapy.sbgn.pd.InhibitionLayout),
+        momapy.builder.get_or_make_builder_cls(
+            momapy.sbgn.pd.NecessaryStimulationLayout
+        ),
+        momapy.builder.get_or_make_builder_cls(momapy.sbgn.pd.CatalysisLayout),
+    )
+    border_queries = []  # borders are computed all at once afterwards
     for layout_element in map_builder.layout.descendants():
         if isinstance(layout_element, momapy.core.ArcLayoutBuilder):
             source = layout_element.source
@@ -112,24 +124,7 @@ def set_arcs_to_borders(map_builder):
                             if hasattr(
                                 other, "base_left_connector"
                             ) and not isinstance(
-                                layout_element,
-                                (
-                                    momapy.builder.get_or_make_builder_cls(
-                                        momapy.sbgn.pd.ModulationLayout
-                                    ),
-                                    momapy.builder.get_or_make_builder_cls(
-                                        momapy.sbgn.pd.StimulationLayout
-                                    ),
-                                    momapy.builder.get_or_make_builder_cls(
-                                        momapy.sbgn.pd.InhibitionLayout
-                                    ),
-                                    momapy.builder.get_or_make_builder_cls(
-                                        momapy.sbgn.pd.NecessaryStimulationLayout
-                                    ),
-                                    momapy.builder.get_or_make_builder_cls(
-                                        momapy.sbgn.pd.CatalysisLayout
-                                    ),
-                                ),
+                                layout_element, modulation_classes
                             ):
                                 if (
                                     other.direction
@@ -147,30 +142,13 @@ def set_arcs_to_borders(map_builder):
                             else:
                                 reference_point = other.center()
                         else:
-                            reference_point = layout_elements.points()[
+                            reference_point = layout_element.points()[
                                 index - increment
                             ]
                         if hasattr(
                             main, "base_left_connector"
                         ) and not isinstance(
-                            layout_element,
-                            (
-                                momapy.builder.get_or_make_builder_cls(
-                                    momapy.sbgn.pd.ModulationLayout
-                                ),
-                                momapy.builder.get_or_make_builder_cls(
-                                    momapy.sbgn.pd.StimulationLayout
-                                ),
-                                momapy.builder.get_or_make_builder_cls(
-                                    momapy.sbgn.pd.InhibitionLayout
-                                ),
-                                momapy.builder.get_or_make_builder_cls(
-                                    momapy.sbgn.pd.NecessaryStimulationLayout
-                                ),
-                                momapy.builder.get_or_make_builder_cls(
-                                    momapy.sbgn.pd.CatalysisLayout
-                                ),
-                            ),
+                            layout_element, modulation_classes
                         ):
                             if (
                                 main.direction
@@ -185,12 +163,24 @@ def set_arcs_to_borders(map_builder):
                                     point = main.north()
                                 else:
                                     point = main.south()
+                            _set_arc_end(layout_element, index, point)
                         else:
-                            point = main.border(reference_point)
-                        if point is not None:
-                            segment = layout_element.segments[index]
-                            attr_name = f"p{[1, 2][index]}"
-                            setattr(segment, attr_name, point)
+                            border_queries.append(
+                                (layout_element, index, main, reference_point)
+                            )
+    points = momapy.core.get_borders(
+        [border_query[2] for border_query in border_queries],
+        [border_query[3] for border_query in border_queries],
+    )
+    for border_query, point in zip(border_queries, points):
+        _set_arc_end(border_query[0], border_query[1], point)
+
+
+def _set_arc_end(layout_element, index, point):
+    if point is not None:
+        segment = layout_element.segments[index]
+        attr_name = f"p{[1, 2][index]}"
+        setattr(segment, attr_name, point)
 
 
 def set_auxilliary_units_to_borders(map_builder):
@@ -6,6 +6,41 @@ import momapy.drawing
 import momapy.geometry
 
 
+def _make_polygon_border_primitives(points):
+    segments = []
+    for i, point in enumerate(points):
+        next_point = points[(i + 1) % len(points)]
+        segments.append((point.x, point.y, next_point.x, next_point.y))
+    return segments, []
+
+
+def _make_rectangle_border_primitives(position, width, height, rx, ry):
+    if rx > width / 2 or ry > height / 2:
+        return None
+    x1 = position.x - width / 2
+    y1 = position.y - height / 2
+    x2 = position.x + width / 2
+    y2 = position.y + height / 2
+    if rx <= 0 or ry <= 0:
+        rx = 0
+        ry = 0
+    segments = [
+        (x1 + rx, y1, x2 - rx, y1),
+        (x2, y1 + ry, x2, y2 - ry),
+        (x2 - rx, y2, x1 + rx, y2),
+        (x1, y2 - ry, x1, y1 + ry),
+    ]
+    elliptical_arcs = []
+    if rx > 0:
+        elliptical_arcs = [
+            (x1 + rx, y1 + ry, rx, ry, -1, -1),
+            (x2 - rx, y1 + ry, rx, ry, 1, -1),
+            (x2 - rx, y2 - ry, rx, ry, 1, 1),
+            (x1 + rx, y2 - ry, rx, ry, -1, 1),
+        ]
+    return segments, elliptical_arcs
+
+
 @dataclass(frozen=True, kw_only=True)
 class Rectangle(momapy.core.NodeLayout):
     def joint1(self):
@@ -30,6 +65,11 @@ class Rectangle(momapy.core.NodeLayout):
         )
         return rectangle
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [self.joint1(), self.joint2(), self.joint3(), self.joint4()]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class RectangleWithRoundedCorners(momapy.core.NodeLayout):
@@ -93,6 +133,15 @@ class RectangleWithRoundedCorners(momapy.core.NodeLayout):
         )
         return rectangle
 
+    def _self_border_primitives(self):
+        return _make_rectangle_border_primitives(
+            self.position,
+            self.width,
+            self.height,
+            self.rounded_corners,
+            self.rounded_corners,
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class Ellipse(momapy.core.NodeLayout):
@@ -102,6 +151,9 @@ class Ellipse(momapy.core.NodeLayout):
         )
         return ellipse
 
+    def _self_border_primitives(self):
+        return [], [(self.x, self.y, self.width / 2, self.height / 2, 0, 0)]
+
 
 @dataclass(frozen=True, kw_only=True)
 class RectangleWithCutCorners(momapy.core.NodeLayout):
@@ -170,6 +222,20 @@ class RectangleWithCutCorners(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [
+                self.joint1(),
+                self.joint2(),
+                self.joint3(),
+                self.joint4(),
+                self.joint5(),
+                self.joint6(),
+                self.joint7(),
+                self.joint8(),
+            ]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class Stadium(momapy.core.NodeLayout):
@@ -207,6 +273,15 @@ class Stadium(momapy.core.NodeLayout):
         )
         return rectangle
 
+    def _self_border_primitives(self):
+        return _make_rectangle_border_primitives(
+            self.position,
+            self.width,
+            self.height,
+            self.height / 2,
+            self.height / 2,
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class RectangleWithBottomRoundedCorners(momapy.core.NodeLayout):
@@ -275,6 +350,29 @@ class RectangleWithBottomRoundedCorners(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        segments = []
+        for p1, p2 in [
+            (self.joint1(), self.joint2()),
+            (self.joint2(), self.joint3()),
+            (self.joint4(), self.joint5()),
+            (self.joint6(), self.joint1()),
+        ]:
+            segments.append((p1.x, p1.y, p2.x, p2.y))
+        elliptical_arcs = []
+        for sx in [1, -1]:
+            elliptical_arcs.append(
+                (
+                    self.x + sx * (self.width / 2 - self.rounded_corners),
+                    self.y + self.height / 2 - self.rounded_corners,
+                    self.rounded_corners,
+                    self.rounded_corners,
+                    sx,
+                    1,
+                )
+            )
+        return segments, elliptical_arcs
+
 
 @dataclass(frozen=True, kw_only=True)
 class CircleWithDiagonalBar(momapy.core.NodeLayout):
@@ -292,6 +390,20 @@ class CircleWithDiagonalBar(momapy.core.NodeLayout):
         group = momapy.drawing.Group(elements=elements)
         return group
 
+    def _self_border_primitives(self):
+        segments = [
+            (
+                self.x - self.width / 2,
+                self.y + self.height / 2,
+                self.x + self.width / 2,
+                self.y - self.height / 2,
+            )
+        ]
+        elliptical_arcs = [
+            (self.x, self.y, self.width / 2, self.height / 2, 0, 0)
+        ]
+        return segments, elliptical_arcs
+
 
 @dataclass(frozen=True, kw_only=True)
 class Hexagon(momapy.core.NodeLayout):
@@ -355,6 +467,18 @@ class Hexagon(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [
+                self.joint1(),
+                self.joint2(),
+                self.joint3(),
+                self.joint4(),
+                self.joint5(),
+                self.joint6(),
+            ]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class InvertedHexagon(momapy.core.NodeLayout):
@@ -430,6 +554,18 @@ class InvertedHexagon(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [
+                self.joint1(),
+                self.joint2(),
+                self.joint3(),
+                self.joint4(),
+                self.joint5(),
+                self.joint6(),
+            ]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class Parallelogram(momapy.core.NodeLayout):
@@ -462,6 +598,11 @@ class Parallelogram(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [self.joint1(), self.joint2(), self.joint3(), self.joint4()]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class InvertedParallelogram(momapy.core.NodeLayout):
@@ -494,6 +635,11 @@ class InvertedParallelogram(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [self.joint1(), self.joint2(), self.joint3(), self.joint4()]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class CircleWithInsideCircle(momapy.core.NodeLayout):
@@ -512,6 +658,20 @@ class CircleWithInsideCircle(momapy.core.NodeLayout):
         group = momapy.drawing.Group(elements=elements)
         return group
 
+    def _self_border_primitives(self):
+        elliptical_arcs = [
+            (self.x, self.y, self.width / 2, self.height / 2, 0, 0),
+            (
+                self.x,
+                self.y,
+                self.width / 2 - self.sep,
+                self.height / 2 - self.sep,
+                0,
+                0,
+            ),
+        ]
+        return [], elliptical_arcs
+
 
 @dataclass(frozen=True, kw_only=True)
 class Pointer(momapy.core.NodeLayout):
@@ -621,6 +781,17 @@ class Pointer(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [
+                self.joint1(),
+                self.joint2(),
+                self.joint3(),
+                self.joint4(),
+                self.joint5(),
+            ]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class RectangleWithRoundedCornersAlongsideRectangleWithRoundedCorners(
@@ -747,6 +918,29 @@ class RectangleWithRoundedCornersAlongsideRectangleWithRoundedCorners(
     def label_center(self):
         return self.position - (self.right_rectangle_width / 2, 0)
 
+    def _self_border_primitives(self):
+        left_primitives = _make_rectangle_border_primitives(
+            self.position - (self.right_rectangle_width / 2, 0),
+            self.width - self.right_rectangle_width,
+            self.height,
+            self.rounded_corners,
+            self.rounded_corners,
+        )
+        right_primitives = _make_rectangle_border_primitives(
+            self.position
+            + (self.width / 2 - self.right_rectangle_width / 2, 0),
+            self.right_rectangle_width,
+            self.height,
+            self.rounded_corners,
+            self.rounded_corners,
+        )
+        if left_primitives is None or right_primitives is None:
+            return None
+        return (
+            left_primitives[0] + right_primitives[0],
+            left_primitives[1] + right_primitives[1],
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class TruncatedRectangleWithLeftRoundedCorners(momapy.core.NodeLayout):
@@ -833,6 +1027,31 @@ class TruncatedRectangleWithLeftRoundedCorners(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        segments = []
+        for p1, p2 in [
+            (self.joint1(), self.joint2()),
+            (self.joint2(), self.joint3()),
+            (self.joint3(), self.joint4()),
+            (self.joint4(), self.joint5()),
+            (self.joint5(), self.joint6()),
+            (self.joint7(), self.joint8()),
+        ]:
+            segments.append((p1.x, p1.y, p2.x, p2.y))
+        elliptical_arcs = []
+        for sy in [1, -1]:
+            elliptical_arcs.append(
+                (
+                    self.x + self.rounded_corners - self.width / 2,
+                    self.y + sy * (self.height / 2 - self.rounded_corners),
+                    self.rounded_corners,
+                    self.rounded_corners,
+                    -1,
+                    sy,
+                )
+            )
+        return segments, elliptical_arcs
+
 
 @dataclass(frozen=True, kw_only=True)
 class FoxHead(momapy.core.NodeLayout):
@@ -885,6 +1104,18 @@ class FoxHead(momapy.core.NodeLayout):
         )
         return path
 
+    def _self_border_primitives(self):
+        return _make_polygon_border_primitives(
+            [
+                self.joint1(),
+                self.joint2(),
+                self.joint3(),
+                self.joint4(),
+                self.joint5(),
+                self.joint6(),
+            ]
+        )
+
 
 @dataclass(frozen=True, kw_only=True)
 class StadiumWithEllipsesWithInsideStadiumWithEllipses(momapy.core.NodeLayout):
@@ -971,6 +1202,20 @@ class StadiumWithEllipsesWithInsideStadiumWithEllipses(momapy.core.NodeLayout):
         group = momapy.drawing.Group(elements=(outer_stadium, inner_stadium))
         return group
 
+    def _self_border_primitives(self):
+        rx = self.horizontal_proportion * self.width
+        ry = self.height / 2
+        x1 = self.x - self.width / 2 + rx
+        x2 = self.x + self.width / 2 - rx
+        segments = []
+        elliptical_arcs = []
+        for sep in [0, self.sep]:
+            segments.append((x1, self.y - ry + sep, x2, self.y - ry + sep))
+            segments.append((x2, self.y + ry - sep, x1, self.y + ry - sep))
+            elliptical_arcs.append((x2, self.y, rx - sep, ry - sep, 1, 0))
+            elliptical_arcs.append((x1, self.y, rx - sep, ry - sep, -1, 0))
+        return segments, elliptical_arcs
+
 
 @dataclass(frozen=True, kw_only=True)
 class CrossPoint(momapy.core.NodeLayout):
@@ -986,3 +1231,20 @@ class CrossPoint(momapy.core.NodeLayout):
         elements = (horizontal_path, vertical_path)
         group = momapy.drawing.Group(elements=elements)
         return group
+
+    def _self_border_primitives(self):
+        segments = [
+            (
+                self.x - self.width / 2,
+                self.y,
+                self.x + self.width / 2,
+                self.y,
+            ),
+            (
+                self.x,
+                self.y - self.height / 2,
+                self.x,
+                self.y + self.height / 2,
+            ),
+        ]
+        return segments, []
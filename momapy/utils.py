@@ -0,0 +1,42 @@
+import importlib
+import types
+
+
+# a module that is only imported when one of its attributes is first accessed;
+# the attributes of the imported module are then copied to it, so that later
+# accesses cost as much as with the module itself
+class LazyModule(types.ModuleType):
+    def __init__(self, name, before_import=None):
+        super().__init__(name)
+        self._lazy_before_import = before_import
+        self._lazy_module = None
+
+    def _load(self):
+        if self._lazy_module is None:
+            if self._lazy_before_import is not None:
+                self._lazy_before_import()
+            module = importlib.import_module(self.__name__)
+            self.__dict__.update(module.__dict__)
+            self._lazy_module = module
+        return self._lazy_module
+
+    def __getattr__(self, name):
+        module = self._load()
+        try:
+            value = getattr(module, name)
+        except AttributeError:  # a submodule not imported by the module
+            try:
+                value = importlib.import_module(f"{self.__name__}.{name}")
+            except ModuleNotFoundError:
+                raise AttributeError(
+                    f"module '{self.__name__}' has no attribute '{name}'"
+                ) from None
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name, before_import=None):
+    return LazyModule(name, before_import)
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import momapy.animating
+import momapy.builder
+import momapy.geometry
+import momapy.sbgn.io
+import momapy.sbgn.pd
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "sbgn", "p1.sbgn"
+)
+
+
+def read_layout():
+    map_ = momapy.sbgn.io.read_file(INPUT_FILE, return_builder=True)
+    return map_.layout
+
+
+# an element added outside of the frame changes no pixel: the previous frame
+# is reused
+def check_offscreen_element(output_file):
+    layout = read_layout()
+    animator = momapy.animating.Animator(
+        layout, output_file=output_file, incremental=True
+    )
+    animator.frames(1)
+    element = momapy.builder.new_builder(
+        momapy.sbgn.pd.MacromoleculeLayout,
+        position=momapy.geometry.Point(-5000, -5000),
+    )
+    layout.add_element(element)
+    animator.frames(1)
+    assert animator._n_images == 1
+    animator.build()
+
+
+# an animator that is not built releases its workers and temporary files
+def check_close():
+    n_files = len(os.listdir(tempfile.gettempdir()))
+    layout = read_layout()
+    with momapy.animating.Animator(layout, max_workers=2) as animator:
+        animator.frames(1)
+        pool = animator._pool
+        assert pool is not None
+    assert animator._pool is None
+    assert len(os.listdir(tempfile.gettempdir())) == n_files
+
+
+if __name__ == "__main__":
+    output_file = sys.argv[1]
+    check_offscreen_element(output_file)
+    check_close()
+    print("ok")
@@ -0,0 +1,48 @@
+import dataclasses
+
+import momapy.core
+import momapy.builder
+import momapy.geometry
+import momapy.sbgn.pd
+import momapy.sbgn.core
+import momapy.sbgn.af
+
+MODULES = [momapy.sbgn.pd, momapy.sbgn.af]
+
+
+def get_node_classes():
+    classes = []
+    for module in MODULES:
+        for obj in vars(module).values():
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, momapy.sbgn.core._SBGNShapeBase)
+                and dataclasses.is_dataclass(obj)
+                and obj.__module__ == module.__name__
+                and not obj.__name__.startswith("_")
+            ):
+                classes.append(obj)
+    return classes
+
+
+def make_node(cls):
+    return cls(position=momapy.geometry.Point(50, 50))
+
+
+# lazy builders must draw the same borders as eager builders and objects
+def check_border_drawing_element(node):
+    builder = momapy.builder.builder_from_object(node)
+    lazy_builder = momapy.builder.builder_from_object(node, lazy=True)
+    elements = node.border_drawing_element().elements
+    assert builder.border_drawing_element().elements == elements
+    assert lazy_builder.border_drawing_element().elements == elements
+    primitives = node._self_border_primitives()
+    assert builder._self_border_primitives() == primitives
+    assert lazy_builder._self_border_primitives() == primitives
+
+
+if __name__ == "__main__":
+    node_classes = get_node_classes()
+    for cls in node_classes:
+        check_border_drawing_element(make_node(cls))
+    print(f"checked {len(node_classes)} node classes")
@@ -0,0 +1,102 @@
+import dataclasses
+import functools
+import time
+import math
+
+import momapy.core
+import momapy.builder
+import momapy.geometry
+import momapy.sbgn.pd
+
+N_ELEMENTS = 2000
+ELEMENT_CLASS = momapy.sbgn.pd.MacromoleculeLayout
+ELEMENT_WIDTH = 60
+ELEMENT_HEIGHT = 30
+ELEMENT_XSEP = 10
+ELEMENT_YSEP = 10
+N_REPEATS = 5
+
+registered = []
+
+
+def register(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        for _ in range(N_REPEATS):
+            func(*args, **kwargs)
+        end_time = time.perf_counter()
+        mean_time = (end_time - start_time) / N_REPEATS
+        print(f"function {func.__name__} took {mean_time:.4f} seconds")
+        return mean_time
+
+    registered.append(wrapper)
+    return wrapper
+
+
+def make_map():
+    SBGNPDMapBuilder = momapy.builder.get_or_make_builder_cls(
+        momapy.sbgn.pd.SBGNPDMap
+    )
+    map_ = SBGNPDMapBuilder()
+    map_.layout = map_.new_layout()
+    n_columns = round(math.sqrt(N_ELEMENTS))
+    elements = []
+    for n in range(N_ELEMENTS):
+        i = n // n_columns
+        j = n % n_columns
+        element = momapy.builder.get_or_make_builder_cls(ELEMENT_CLASS)()
+        element.position = momapy.geometry.PointBuilder(
+            j * (ELEMENT_WIDTH + ELEMENT_XSEP) + ELEMENT_WIDTH / 2,
+            i * (ELEMENT_HEIGHT + ELEMENT_YSEP) + ELEMENT_HEIGHT / 2,
+        )
+        element.width = ELEMENT_WIDTH
+        element.height = ELEMENT_HEIGHT
+        map_.layout.add_element(element)
+        elements.append(element)
+    for source, target in zip(elements, elements[1:]):
+        arc = momapy.builder.get_or_make_builder_cls(
+            momapy.sbgn.pd.ProductionLayout
+        )()
+        arc.source = source
+        arc.target = target
+        arc.segments = momapy.core.TupleBuilder(
+            [
+                momapy.builder.get_or_make_builder_cls(momapy.geometry.Segment)(
+                    source.position, target.position
+                )
+            ]
+        )
+        map_.layout.add_element(arc)
+    return map_.build()
+
+
+def use_generic_builders():
+    for builder_cls in momapy.builder.builders.values():
+        if dataclasses.is_dataclass(builder_cls):
+            builder_cls.build = momapy.builder.build_generic
+            builder_cls.from_object = classmethod(
+                momapy.builder.from_object_generic
+            )
+
+
+@register
+def builder_from_object(map_):
+    momapy.builder.builder_from_object(map_)
+
+
+@register
+def build(map_):
+    momapy.builder.builder_from_object(map_).build()
+
+
+if __name__ == "__main__":
+    print("shape: ", ELEMENT_CLASS, "n: ", N_ELEMENTS)
+    map_ = make_map()
+    print("specialized builders")
+    for registered_func in registered:
+        registered_func(map_)
+    use_generic_builders()
+    print("generic builders")
+    for registered_func in registered:
+        registered_func(map_)
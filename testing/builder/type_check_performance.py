@@ -0,0 +1,105 @@
+import functools
+import timeit
+
+import momapy.core
+import momapy.builder
+import momapy.geometry
+import momapy.sbgn.pd
+
+N_NUMBER = 100000
+N_SEGMENTS = 1000
+N_ARC_NUMBER = 20
+
+registered = []
+
+
+def register(number):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            total_time = timeit.timeit(
+                lambda: func(*args, **kwargs), number=number
+            )
+            mean_time = total_time / number * 1e6
+            print(f"function {func.__name__} took {mean_time:.3f} us")
+            return mean_time
+
+        registered.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def make_arc(n_segments):
+    points = [
+        momapy.geometry.Point(i * 10, (i % 2) * 10)
+        for i in range(n_segments + 1)
+    ]
+    segments = tuple(
+        [
+            momapy.geometry.Segment(point, next_point)
+            for point, next_point in zip(points, points[1:])
+        ]
+    )
+    return momapy.sbgn.pd.ProductionLayout(segments=segments)
+
+
+point = momapy.geometry.Point(1.0, 2.0)
+point_builder = momapy.geometry.PointBuilder(3.0, 4.0)
+arc = make_arc(N_SEGMENTS)
+arc_builder = momapy.builder.builder_from_object(arc)
+
+
+@register(N_NUMBER)
+def plain_isinstance():
+    isinstance(point_builder, momapy.geometry.PointBuilder)
+
+
+@register(N_NUMBER)
+def isinstance_or_builder():
+    momapy.builder.isinstance_or_builder(point_builder, momapy.geometry.Point)
+
+
+@register(N_NUMBER)
+def isinstance_or_builder_tuple():
+    momapy.builder.isinstance_or_builder(
+        point_builder, (momapy.core.NodeLayout, momapy.geometry.Point)
+    )
+
+
+@register(N_NUMBER)
+def issubclass_or_builder():
+    momapy.builder.issubclass_or_builder(
+        momapy.geometry.PointBuilder, momapy.geometry.Point
+    )
+
+
+@register(N_NUMBER)
+def point_add_point():
+    point + point
+
+
+@register(N_NUMBER)
+def point_add_point_builder():
+    point + point_builder
+
+
+@register(N_NUMBER)
+def point_sub_tuple():
+    point - (1.0, 1.0)
+
+
+@register(N_ARC_NUMBER)
+def arc_self_drawing_elements():
+    arc.self_drawing_elements()
+
+
+@register(N_ARC_NUMBER)
+def arc_builder_self_drawing_elements():
+    arc_builder.self_drawing_elements()
+
+
+if __name__ == "__main__":
+    print("segments: ", N_SEGMENTS)
+    for registered_func in registered:
+        registered_func()
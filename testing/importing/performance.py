@@ -0,0 +1,100 @@
+import functools
+import re
+import subprocess
+import sys
+
+N_NUMBER = 5
+# cumulative import times budgets, in ms
+BUDGETS = {
+    "momapy.core": 300,
+    "momapy.sbgn.io": 700,
+    "momapy.celldesigner.io": 800,
+}
+# modules that should only be loaded on first use
+LAZY_MODULES = [
+    "numpy",
+    "shapely",
+    "bezier",
+    "cairo",
+    "gi",
+    "skia",
+    "ffmpeg",
+]
+
+registered = []
+
+
+def get_import_times(module_name):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)", line)
+        if match is not None:
+            import_times[match.group(3)] = int(match.group(2)) / 1000
+    return import_times
+
+
+def register(module_name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            results = [get_import_times(module_name) for _ in range(N_NUMBER)]
+            import_time = min([result[module_name] for result in results])
+            budget = BUDGETS[module_name]
+            status = "OK" if import_time <= budget else "OVER BUDGET"
+            print(
+                f"import {module_name} took {import_time:.1f} ms "
+                f"(budget {budget} ms): {status}"
+            )
+            eager_modules = [
+                lazy_module
+                for lazy_module in LAZY_MODULES
+                if lazy_module in results[0]
+            ]
+            if eager_modules:
+                print(f"    eagerly loaded: {', '.join(eager_modules)}")
+            func(results[0])
+            return import_time
+
+        registered.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def print_slowest(import_times, n=5):
+    momapy_import_times = sorted(
+        [
+            (import_time, module_name)
+            for module_name, import_time in import_times.items()
+            if module_name.startswith("momapy.")
+        ],
+        reverse=True,
+    )
+    for import_time, module_name in momapy_import_times[:n]:
+        print(f"    {module_name}: {import_time:.1f} ms")
+
+
+@register("momapy.core")
+def import_core(import_times):
+    print_slowest(import_times)
+
+
+@register("momapy.sbgn.io")
+def import_sbgn_io(import_times):
+    print_slowest(import_times)
+
+
+@register("momapy.celldesigner.io")
+def import_celldesigner_io(import_times):
+    print_slowest(import_times)
+
+
+if __name__ == "__main__":
+    for registered_func in registered:
+        registered_func()
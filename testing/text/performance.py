@@ -0,0 +1,175 @@
+import functools
+import time
+import math
+
+import cairo
+import gi
+
+gi.require_version("Pango", "1.0")
+gi.require_version("PangoCairo", "1.0")
+from gi.repository import Pango, PangoCairo
+
+import momapy.core
+import momapy.builder
+import momapy.geometry
+import momapy.sbgn.pd
+import momapy.sbgn.utils
+
+N_ELEMENTS = 2000
+N_DISTINCT_LABELS = 200
+ELEMENT_CLASS = momapy.sbgn.pd.MacromoleculeLayout
+ELEMENT_WIDTH = 60
+ELEMENT_HEIGHT = 30
+ELEMENT_XSEP = 10
+ELEMENT_YSEP = 10
+LABEL_FONT = "Arial"
+LABEL_SIZE = 10
+LABEL_TEXT = "LABEL"
+N_PASSES = 3
+
+registered = []
+n_pango_layouts = 0
+
+
+def register(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global n_pango_layouts
+        n_pango_layouts = 0
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        end_time = time.perf_counter()
+        measuring_time = end_time - start_time
+        print(
+            f"function {func.__name__} took {measuring_time:.4f} seconds, "
+            f"making {n_pango_layouts} text layouts"
+        )
+        return measuring_time
+
+    registered.append(wrapper)
+    return wrapper
+
+
+# counts the text layouts made by text layouts and their builders, that is the
+# number of text measurements that are not cached
+def count_pango_layouts():
+    make_pango_layout = momapy.core.TextLayout._make_pango_layout
+
+    @functools.wraps(make_pango_layout)
+    def wrapper(self):
+        global n_pango_layouts
+        n_pango_layouts += 1
+        return make_pango_layout(self)
+
+    momapy.core.TextLayout._make_pango_layout = wrapper
+    momapy.builder.get_or_make_builder_cls(
+        momapy.core.TextLayout
+    )._make_pango_layout = wrapper
+
+
+# the text measurement cache is not in versions prior to it, against which the
+# script can also be run
+def clear_text_measurement_cache():
+    text_measurement_cache = getattr(
+        momapy.core, "text_measurement_cache", None
+    )
+    if text_measurement_cache is not None:
+        text_measurement_cache.clear()
+    return text_measurement_cache
+
+
+def make_map():
+    SBGNPDMapBuilder = momapy.builder.get_or_make_builder_cls(
+        momapy.sbgn.pd.SBGNPDMap
+    )
+    map_ = SBGNPDMapBuilder()
+    map_.layout = map_.new_layout()
+    n_columns = round(math.sqrt(N_ELEMENTS))
+    for n in range(N_ELEMENTS):
+        i = n // n_columns
+        j = n % n_columns
+        element = momapy.builder.get_or_make_builder_cls(ELEMENT_CLASS)()
+        element.position = momapy.geometry.PointBuilder(
+            j * (ELEMENT_WIDTH + ELEMENT_XSEP) + ELEMENT_WIDTH / 2,
+            i * (ELEMENT_HEIGHT + ELEMENT_YSEP) + ELEMENT_HEIGHT / 2,
+        )
+        element.width = ELEMENT_WIDTH
+        element.height = ELEMENT_HEIGHT
+        label = momapy.core.TextLayoutBuilder()
+        label.text = f"{LABEL_TEXT} {n % N_DISTINCT_LABELS}"
+        label.font_family = LABEL_FONT
+        label.font_size = LABEL_SIZE
+        label.position = element.label_center()
+        element.label = label
+        map_.layout.add_element(element)
+    return map_
+
+
+def get_labels(map_):
+    return [element.label for element in map_.layout.layout_elements]
+
+
+# the text layout measurement prior to the shared text-shaping context
+def make_pango_layout_with_surface(text_layout):
+    global n_pango_layouts
+    n_pango_layouts += 1
+    cairo_surface = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+    cairo_context = cairo.Context(cairo_surface)
+    pango_layout = PangoCairo.create_layout(cairo_context)
+    pango_layout.set_alignment(
+        getattr(Pango.Alignment, text_layout.horizontal_alignment.name)
+    )
+    pango_font_description = Pango.FontDescription()
+    pango_font_description.set_family(text_layout.font_family)
+    pango_font_description.set_absolute_size(
+        Pango.units_from_double(text_layout.font_size)
+    )
+    pango_layout.set_font_description(pango_font_description)
+    if text_layout.width is not None:
+        pango_layout.set_width(Pango.units_from_double(text_layout.width))
+    if text_layout.height is not None:
+        pango_layout.set_height(Pango.units_from_double(text_layout.height))
+    pango_layout.set_text(text_layout.text)
+    pango_layout.set_justify(text_layout.justify)
+    return pango_layout
+
+
+@register
+def measure_with_surface_per_call(map_):
+    for _ in range(N_PASSES):
+        for label in get_labels(map_):
+            make_pango_layout_with_surface(label).get_pixel_extents()
+
+
+# with the shared text-shaping context, if any
+@register
+def measure_with_make_pango_layout(map_):
+    for _ in range(N_PASSES):
+        for label in get_labels(map_):
+            label._make_pango_layout().get_pixel_extents()
+
+
+# with the text measurement cache, if any
+@register
+def measure_logical_bboxes(map_):
+    text_measurement_cache = clear_text_measurement_cache()
+    for _ in range(N_PASSES):
+        for label in get_labels(map_):
+            label.logical_bbox()
+    if text_measurement_cache is not None:
+        print(text_measurement_cache.cache_info)
+
+
+@register
+def fit_nodes_to_labels(map_):
+    clear_text_measurement_cache()
+    for _ in range(N_PASSES):
+        momapy.sbgn.utils.set_nodes_to_fit_labels(map_)
+
+
+if __name__ == "__main__":
+    print("n: ", N_ELEMENTS, "distinct labels: ", N_DISTINCT_LABELS)
+    count_pango_layouts()
+    map_ = make_map()
+    for registered_func in registered:
+        registered_func(map_)